@@ -20,7 +20,9 @@ IMPORTANTE:
 
 from __future__ import annotations
 
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -29,12 +31,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from sqlalchemy import func
 
 from backend.app.db.session import get_db
 from backend.app.db import models
 from backend.app.core.config import settings
+from backend.app.utils.cache import MemoryCache
 
 
 # ---------- Config JWT ----------
@@ -42,6 +45,13 @@ SECRET_KEY = settings.SECRET_KEY or os.getenv("SECRET_KEY", "gapptomobile-secret
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+# ---------- Caché de autenticación ----------
+# token (sha256) -> (generación del usuario, User detached).
+# Evita decodificar el JWT y el SELECT sobre users en cada petición.
+# Es local al proceso: guarda objetos ORM, no bytes, así que no va a Redis.
+AUTH_CACHE_TTL = 60
+_auth_cache = MemoryCache(maxsize=10_000)
+
 # ---------- Router ----------
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer(auto_error=False)
@@ -109,6 +119,40 @@ def verify_password(plain: str, stored: str) -> bool:
     return plain == stored
 
 
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _user_gen_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _detached_user_copy(user: models.User) -> models.User:
+    """
+    Copia "detached" del usuario con sus columnas ya cargadas, para poder
+    compartirla entre peticiones sin atarla a ninguna sesión.
+    """
+    copy = models.User(
+        id=user.id,
+        email=user.email,
+        password=user.password,
+        full_name=user.full_name,
+        is_active=user.is_active,
+        created_at=user.created_at,
+        role=user.role,
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
+def forget_user(user_id: int) -> None:
+    """
+    Invalida las entradas de la caché de autenticación de un usuario
+    (llamar al modificarlo o borrarlo).
+    """
+    _auth_cache.incr(_user_gen_key(user_id))
+
+
 # =========================================================
 # Endpoints
 # =========================================================
@@ -178,6 +222,9 @@ def require_user(
         * que tenga 'sub',
         * que el usuario exista y esté activo.
 
+    El resultado se cachea por token durante AUTH_CACHE_TTL segundos
+    (como máximo hasta que expira el token).
+
     Si falla, lanza 401.
     """
     if not creds or (creds.scheme or "").lower() != "bearer":
@@ -186,6 +233,14 @@ def require_user(
             detail="Falta Bearer token",
         )
 
+    token_key = _token_key(creds.credentials)
+    cached = _auth_cache.get(token_key)
+    if cached is not None:
+        gen, cached_user = cached
+        if gen == _auth_cache.version(_user_gen_key(cached_user.id)):
+            # merge(load=False): instancia de esta sesión sin SELECT
+            return db.merge(cached_user, load=False)
+
     try:
         payload = jwt.decode(creds.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         sub = payload.get("sub")
@@ -212,9 +267,29 @@ def require_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario no encontrado o inactivo",
         )
+
+    # TTL acotado por la expiración del token: nunca servir un token caducado
+    ttl = AUTH_CACHE_TTL
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = min(ttl, int(exp - time.time()))
+    if ttl > 0:
+        gen = _auth_cache.version(_user_gen_key(user.id))
+        _auth_cache.set(token_key, (gen, _detached_user_copy(user)), ttl)
     return user
 
 
+def require_user_id(user: models.User = Depends(require_user)) -> int:
+    """
+    Igual que require_user, pero devuelve sólo el id (int).
+
+    Para endpoints que únicamente filtran por usuario: trabajan con un entero
+    y no con la instancia ORM, así que ningún acceso posterior puede disparar
+    un refresh/lazy load del User.
+    """
+    return user.id
+
+
 @router.get("/me")
 def me(current: models.User = Depends(require_user)):
     """
@@ -37,6 +37,7 @@ from backend.app.schemas.cuentas import (
 )
 from backend.app.utils.id_utils import generate_cuenta_bancaria_id
 from backend.app.utils.proveedor_utils import ensure_proveedor_es_banco
+from backend.app.api.v1.movimientos_cuenta_router import invalidate_movimientos_cache
 
 
 router = APIRouter(
@@ -231,6 +232,8 @@ def update_cuenta_bancaria(
 
     db.commit()
     db.refresh(obj)
+    # Los listados de movimientos muestran anagrama
+    invalidate_movimientos_cache(obj.user_id)
     return obj
 
 
@@ -259,6 +262,9 @@ def delete_cuenta_bancaria(
             detail="Cuenta bancaria no encontrada.",
         )
 
+    user_id = obj.user_id
     db.delete(obj)
     db.commit()
+    # El borrado arrastra sus movimientos (cascade)
+    invalidate_movimientos_cache(user_id)
     return None
@@ -127,6 +127,8 @@ def _upperize_payload(d: Dict[str, Any]) -> None:
     """
     Recorre el dict y pasa a MAYÚSCULAS los campos definidos en
     _UPPER_FIELDS y _UPPER_ID_FIELDS, si son strings no vacíos.
+
+    Además normaliza periodicidad "PAGO ÚNICO" -> "PAGO UNICO".
     """
     for k in list(d.keys()):
         v = d.get(k, None)
@@ -135,6 +137,10 @@ def _upperize_payload(d: Dict[str, Any]) -> None:
         if k in _UPPER_FIELDS | _UPPER_ID_FIELDS and isinstance(v, str):
             d[k] = v.upper()
 
+    # Variante legacy con tilde: se guarda siempre como "PAGO UNICO"
+    if d.get("periodicidad") == "PAGO ÚNICO":
+        d["periodicidad"] = "PAGO UNICO"
+
 
 def _str_empty_to_none(d: Dict[str, Any], keys: List[str]) -> None:
     """
@@ -23,6 +23,7 @@ Solo se han cambiado:
 from typing import List, Optional, Any, Dict
 from datetime import date
 from calendar import monthrange
+from functools import lru_cache
 import secrets
 import string
 import re
@@ -33,10 +34,12 @@ from fastapi import (
     Depends,
     status,
     Query,
+    Response,
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy import func, cast, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, DataError
 
 from backend.app.db.session import get_db
@@ -48,9 +51,9 @@ from backend.app.schemas.ingresos import (
 )
 from backend.app.utils.common import safe_float, adjust_liquidez, extract_cuenta_id
 from backend.app.utils.id_utils import generate_ingreso_id
-from backend.app.utils.text_utils import normalize_upper
 from backend.app.core.constants import PERIODICIDAD_PAGO_UNICO
 from backend.app.api.v1.auth_router import require_user
+from backend.app.api.v1.monthly_summary_router import invalidate_monthly_summary_cache
 
 # Creamos router sin prefix; se aplicará "/api/ingresos" en main.py
 router = APIRouter(tags=["ingresos"])
@@ -63,6 +66,23 @@ router = APIRouter(tags=["ingresos"])
 _ID_RE = re.compile(r"^INGRESO-[A-Z0-9]{6}$")
 _ALPHABET = string.ascii_uppercase + string.digits
 
+# Campos de texto/IDs que se guardan en MAYÚSCULAS (ver regla global)
+_TEXT_FIELDS = (
+    "rango_cobro",
+    "periodicidad",
+    "concepto",
+    "tipo_id",
+    "referencia_vivienda_id",
+    "cuenta_id",
+)
+
+# Listados: _serialize_ingreso ya devuelve dicts con exactamente las claves
+# de IngresoSchema, así que se serializan a JSON directamente en una sola
+# llamada a pydantic-core (sin construir/validar IngresoSchema por fila).
+# El schema para OpenAPI se declara vía `responses`.
+_LIST_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+_LIST_RESPONSES = {200: {"model": List[IngresoSchema]}}
+
 
 def to_payload(model: BaseModel, *, exclude_unset: bool = False) -> Dict[str, Any]:
     """
@@ -75,6 +95,16 @@ def to_payload(model: BaseModel, *, exclude_unset: bool = False) -> Dict[str, An
     return model.dict(exclude_unset=exclude_unset)
 
 
+def _list_response(rows: List[Dict[str, Any]]) -> Response:
+    """
+    Devuelve una lista de ingresos (dicts de _serialize_ingreso) como JSON.
+    """
+    return Response(
+        content=_LIST_ADAPTER.dump_json(rows),
+        media_type="application/json",
+    )
+
+
 def _norm_ref_id(val) -> str | None:
     """
     Normaliza referencia_vivienda_id:
@@ -91,14 +121,17 @@ def _norm_ref_id(val) -> str | None:
     return s.upper()
 
 
-def _serialize_ingreso(obj: Any) -> Dict[str, Any]:
+def _serialize_ingreso(obj: Any, importe: Optional[float] = None) -> Dict[str, Any]:
     """
     Convierte un objeto ORM de Ingreso en un dict listo para el schema.
 
     Se asegura de:
-    - Convertir importe a float.
+    - Convertir importe a float (o usar el importe ya calculado si se pasa).
     - Resolver cuenta_id aunque venga por relación.
     """
+    if importe is None:
+        importe = float(getattr(obj, "importe", 0) or 0)
+    user = getattr(obj, "user", None)
     return {
         "id": obj.id,
         "fecha_inicio": getattr(obj, "fecha_inicio", None),
@@ -107,7 +140,7 @@ def _serialize_ingreso(obj: Any) -> Dict[str, Any]:
         "tipo_id": getattr(obj, "tipo_id", None),
         "referencia_vivienda_id": getattr(obj, "referencia_vivienda_id", None),
         "concepto": getattr(obj, "concepto", None),
-        "importe": float(getattr(obj, "importe", 0) or 0),
+        "importe": importe,
         "activo": getattr(obj, "activo", True),
         "cobrado": getattr(obj, "cobrado", False),
         "kpi": getattr(obj, "kpi", False),
@@ -122,29 +155,56 @@ def _serialize_ingreso(obj: Any) -> Dict[str, Any]:
 
         # ✅ usuario
         "user_id": getattr(obj, "user_id", None),
-        "user_nombre": getattr(getattr(obj, "user", None), "nombre", None)
-                      or getattr(getattr(obj, "user", None), "email", None),
+        "user_nombre": getattr(user, "nombre", None)
+                      or getattr(user, "email", None),
     }
 
 
 def _serialize_ingreso_ponderado(
     obj: Any,
-    pct_map: Dict[str, float],
+    pct_map: Dict[str, Optional[float]],
 ) -> Dict[str, Any]:
     """
     Serializa el ingreso ponderando el importe por la participación_pct
     de Patrimonio según referencia_vivienda_id.
+
+    - Sin vivienda, vivienda no encontrada o participacion_pct NULL -> 100%.
+    - participacion_pct = 0 es un 0% real (importe 0), no "sin dato".
+
+    El dict se construye una sola vez con el importe ya ponderado.
     """
-    data = _serialize_ingreso(obj)
-    ref = _norm_ref_id(data.get("referencia_vivienda_id"))
-    pct = pct_map.get(ref, 100.0) if ref else 100.0
-    try:
-        data["importe"] = round(
-            float(data.get("importe") or 0.0) * (pct / 100.0), 2
-        )
-    except Exception:
-        pass
-    return data
+    ref = _norm_ref_id(getattr(obj, "referencia_vivienda_id", None))
+    pct = pct_map.get(ref) if ref else None
+    # Comparación explícita con None: 0 es un valor válido
+    factor = 1.0 if pct is None else float(pct) / 100.0
+    base = float(getattr(obj, "importe", 0.0) or 0.0)
+    return _serialize_ingreso(obj, importe=round(base * factor, 2))
+
+
+def _load_participacion_map(db: Session, objs: List[Any]) -> Dict[str, Optional[float]]:
+    """
+    Carga en una sola query participacion_pct de las viviendas referenciadas
+    por los ingresos dados: {patrimonio_id: participacion_pct o None si NULL}.
+
+    Sustituye al outer join por fila (solo hay unas pocas viviendas distintas).
+    """
+    ids = {
+        o.referencia_vivienda_id
+        for o in objs
+        if getattr(o, "referencia_vivienda_id", None)
+    }
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(models.Patrimonio.id, models.Patrimonio.participacion_pct)
+        .filter(models.Patrimonio.id.in_(ids))
+        .all()
+    )
+    return {
+        _norm_ref_id(pid): (None if pct is None else float(pct))
+        for pid, pct in rows
+    }
 
 
 def _normalize_ingreso_text_payload(d: Dict[str, Any]) -> None:
@@ -155,18 +215,14 @@ def _normalize_ingreso_text_payload(d: Dict[str, Any]) -> None:
     En ingresos no hay observaciones, así que:
     - rango_cobro, periodicidad, concepto se guardan UPPER.
     - tipo_id, referencia_vivienda_id, cuenta_id también se fuerzan a UPPER.
+
+    Misma semántica que normalize_upper (strip + upper, vacío -> None), en
+    una sola pasada sobre _TEXT_FIELDS y sin llamada por campo.
     """
-    text_fields = [
-        "rango_cobro",
-        "periodicidad",
-        "concepto",
-        "tipo_id",
-        "referencia_vivienda_id",
-        "cuenta_id",
-    ]
-    for f in text_fields:
-        if f in d:
-            d[f] = normalize_upper(d.get(f))
+    for f in _TEXT_FIELDS:
+        v = d.get(f)
+        if v is not None:
+            d[f] = v.strip().upper() or None
 
 
 def _get_ingreso_for_user(
@@ -194,7 +250,7 @@ def _get_ingreso_for_user(
 # Vistas rápidas (para UI)
 # ============================================================
 
-@router.get("/pendientes", response_model=List[IngresoSchema])
+@router.get("/pendientes", response_model=None, responses=_LIST_RESPONSES)
 def list_pendientes(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
@@ -215,10 +271,10 @@ def list_pendientes(
         )
         .all()
     )
-    return [_serialize_ingreso(o) for o in objs]
+    return _list_response([_serialize_ingreso(o) for o in objs])
 
 
-@router.get("/activos", response_model=List[IngresoSchema])
+@router.get("/activos", response_model=None, responses=_LIST_RESPONSES)
 def list_activos(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
@@ -238,10 +294,10 @@ def list_activos(
         )
         .all()
     )
-    return [_serialize_ingreso(o) for o in objs]
+    return _list_response([_serialize_ingreso(o) for o in objs])
 
 
-@router.get("/inactivos", response_model=List[IngresoSchema])
+@router.get("/inactivos", response_model=None, responses=_LIST_RESPONSES)
 def list_inactivos(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
@@ -261,7 +317,7 @@ def list_inactivos(
         )
         .all()
     )
-    return [_serialize_ingreso(o) for o in objs]
+    return _list_response([_serialize_ingreso(o) for o in objs])
 
 
 # ============================================================
@@ -296,19 +352,7 @@ def create_ingreso(
     """
     payload = to_payload(ingreso_in)
 
-    # Strings vacíos -> None
-    for k in [
-        "rango_cobro",
-        "periodicidad",
-        "tipo_id",
-        "referencia_vivienda_id",
-        "concepto",
-        "cuenta_id",
-    ]:
-        if k in payload and isinstance(payload[k], str) and payload[k].strip() == "":
-            payload[k] = None
-
-    # Normalización a MAYÚSCULAS según regla global
+    # Normalización a MAYÚSCULAS según regla global (strings vacíos -> None)
     _normalize_ingreso_text_payload(payload)
 
     # ID con patrón requerido
@@ -329,52 +373,69 @@ def create_ingreso(
         payload["kpi"] = False
         payload["inactivatedon"] = func.now()
         payload["ultimo_ingreso_on"] = func.now()
-    # Insert (reintenta si colisión de PK)
-    for _ in range(5):
-        try:
-            obj = models.Ingreso(**payload)
-            db.add(obj)
-
-            # Si es PAGO UNICO, sumar liquidez en la cuenta (alta ya cobrada)
-            if periodicidad == PERIODICIDAD_PAGO_UNICO:
-                adjust_liquidez(db, cuenta_id, +importe)
-
-            db.commit()
-            db.refresh(obj)
-            return _serialize_ingreso(obj)
-
-        except IntegrityError:
-            db.rollback()
+    # Insert con ON CONFLICT DO NOTHING: una colisión de PK no aborta la
+    # transacción (sin rollback); solo se regenera el ID y se reintenta.
+    try:
+        obj = None
+        for _ in range(5):
+            stmt = (
+                pg_insert(models.Ingreso)
+                .values(**payload)
+                .on_conflict_do_nothing(index_elements=[models.Ingreso.id])
+                .returning(models.Ingreso)
+            )
+            obj = db.scalars(stmt).first()
+            if obj is not None:
+                break
             payload["id"] = generate_ingreso_id()
-        except DataError as e:
+
+        if obj is None:
             db.rollback()
             raise HTTPException(
-                status_code=400,
-                detail=f"Datos inválidos: {e.orig}",
+                status_code=500,
+                detail=(
+                    "No se pudo generar un ID único para el ingreso "
+                    "tras varios intentos."
+                ),
             )
 
-    raise HTTPException(
-        status_code=500,
-        detail=(
-            "No se pudo generar un ID único para el ingreso "
-            "tras varios intentos."
-        ),
-    )
+        # Si es PAGO UNICO, sumar liquidez en la cuenta (alta ya cobrada)
+        if periodicidad == PERIODICIDAD_PAGO_UNICO:
+            adjust_liquidez(db, cuenta_id, +importe)
+
+        # Serializamos antes del commit: el commit expira obj y leerlo
+        # después forzaría un SELECT extra para recargarlo.
+        out = _serialize_ingreso(obj)
+        db.commit()
+    except (IntegrityError, DataError) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Datos inválidos: {e.orig}",
+        )
+
+    # El INSERT de Core no pasa por el flush: el resumen mensual no se entera solo
+    invalidate_monthly_summary_cache(payload["user_id"])
+    return out
 
 
 # ============================================================
 # EXTRAORDINARIOS (PAGO ÚNICO) - INGRESOS (ponderado)
 # ============================================================
 
+@lru_cache(maxsize=256)
 def _month_range(year: int, month: int) -> tuple[date, date]:
     """
     Devuelve (primer_día, último_día) del mes indicado.
+
+    Cacheado: los dashboards piden el mismo mes repetidamente y el
+    resultado (tupla de dates inmutables) es seguro de compartir.
     """
     last = monthrange(year, month)[1]
     return date(year, month, 1), date(year, month, last)
 
 
-@router.get("/extra", response_model=List[IngresoSchema])
+@router.get("/extra", response_model=None, responses=_LIST_RESPONSES)
 def list_ingresos_extra(
     month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None, ge=1900, le=3000),
@@ -396,11 +457,7 @@ def list_ingresos_extra(
     )
 
     qset = (
-        db.query(models.Ingreso, models.Patrimonio.participacion_pct)
-        .outerjoin(
-            models.Patrimonio,
-            models.Patrimonio.id == models.Ingreso.referencia_vivienda_id,
-        )
+        db.query(models.Ingreso)
         .filter(
             models.Ingreso.user_id == current_user.id,
             func.upper(models.Ingreso.periodicidad) == PERIODICIDAD_PAGO_UNICO,
@@ -422,22 +479,13 @@ def list_ingresos_extra(
         models.Ingreso.createon.desc(),
     )
 
-    rows = qset.all()
-    out: List[dict] = []
-    for inc, pct in rows:
-        ref = _norm_ref_id(getattr(inc, "referencia_vivienda_id", None))
-        factor = (float(pct or 100.0) / 100.0) if ref else 1.0
-        base = float(getattr(inc, "importe", 0.0) or 0.0)
-        ponderado = round(base * factor, 2)
+    objs = qset.all()
+    pct_map = _load_participacion_map(db, objs)
+    return _list_response([_serialize_ingreso_ponderado(o, pct_map) for o in objs])
 
-        d = _serialize_ingreso(inc)
-        d["importe"] = ponderado
-        out.append(d)
-
-    return out
 
-@router.get("/", response_model=List[IngresoSchema])
-@router.get("", response_model=List[IngresoSchema], include_in_schema=False)
+@router.get("/", response_model=None, responses=_LIST_RESPONSES)
+@router.get("", response_model=None, responses=_LIST_RESPONSES, include_in_schema=False)
 def list_all(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
@@ -454,7 +502,7 @@ def list_all(
         )
         .all()
     )
-    return [_serialize_ingreso(o) for o in objs]
+    return _list_response([_serialize_ingreso(o) for o in objs])
 
 
 @router.get("/{ingreso_id}", response_model=IngresoSchema)
@@ -1,11 +1,29 @@
 from __future__ import annotations
 
-from decimal import Decimal, InvalidOperation
-from typing import List, Optional
-from uuid import uuid4
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+import base64
+import json
+from datetime import date
+from functools import lru_cache
+from decimal import Context, Decimal, InvalidOperation, localcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Float,
+    Numeric,
+    and_,
+    bindparam,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, joinedload
 
 from backend.app.db.session import get_db
 from backend.app.db import models
@@ -18,33 +36,100 @@ from backend.app.schemas.inversiones import (
     InversionKpisOut,
     KpiBlock,
 )
+from backend.app.utils.cache import cache_get, cache_key, cache_set, invalidate
 from backend.app.utils.text_utils import normalize_upper_ascii
 from backend.app.api.v1.auth_router import require_user
 
 
 router = APIRouter(prefix="/inversiones", tags=["inversiones"])
 
+# Caché del listado completo (sin paginar), por usuario y filtros.
+# Se invalida en crear/actualizar/eliminar inversión.
+_LIST_CACHE_TTL = 30
+_LIST_ADAPTER = TypeAdapter(List[InversionOut])
+
+# Serializador JSON para listados que ya vienen como dicts con las claves del schema
+_ROWS_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+
+def _list_cache_ns(user_id: int) -> str:
+    return f"inv:{user_id}"
+
+
+# Campos de InversionUpdate con validación/normalización propia; el resto
+# se copia tal cual (ver actualizar_inversion).
+_UPDATE_SPECIAL_FIELDS = frozenset({"tipo_gasto_id", "proveedor_id", "dealer_id", "nombre"})
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
 
-def gen_inversion_id() -> str:
-    return "INV-" + uuid4().hex[:10].upper()
+# Relaciones que InversionOut lee por fila: se cargan en la misma
+# query para evitar 3 SELECT lazy por inversión (N+1).
+_INVERSION_OUT_OPTIONS = (
+    joinedload(models.Inversion.tipo_gasto),
+    joinedload(models.Inversion.proveedor),
+    joinedload(models.Inversion.dealer),
+)
 
 
-def _require_owned_inversion(db: Session, inversion_id: str, user_id: int) -> models.Inversion:
-    row = db.get(models.Inversion, inversion_id)
+def _require_owned_inversion(
+    db: Session,
+    inversion_id: str,
+    user_id: int,
+    *,
+    eager: bool = False,
+) -> models.Inversion:
+    row = db.get(
+        models.Inversion,
+        inversion_id,
+        options=_INVERSION_OUT_OPTIONS if eager else None,
+    )
     if not row or row.user_id != user_id:
         raise HTTPException(status_code=404, detail="Inversión no encontrada")
     return row
 
 
-def _require_owned_proveedor(db: Session, proveedor_id: str, user_id: int) -> models.Proveedor:
-    p = db.get(models.Proveedor, proveedor_id)
-    if not p or p.user_id != user_id:
+def _require_owned_proveedores(
+    db: Session,
+    proveedor_ids: List[Optional[str]],
+    user_id: int,
+) -> dict:
+    """
+    Valida proveedor/dealer en un único SELECT ... WHERE id IN (...).
+    Ignora los ids vacíos. Devuelve {id: Proveedor}.
+    """
+    ids = {pid for pid in proveedor_ids if pid}
+    if not ids:
+        return {}
+
+    found = {
+        p.id: p
+        for p in db.query(models.Proveedor)
+        .filter(models.Proveedor.id.in_(ids), models.Proveedor.user_id == user_id)
+        .all()
+    }
+    if len(found) != len(ids):
         raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-    return p
+    return found
+
+
+# Id del segmento "INVERSIÓN" (tipo_segmentos_gasto): se resuelve una vez por
+# proceso; los segmentos son un catálogo estático.
+_INVERSION_SEG_ID: Optional[str] = None
+
+
+def _get_inversion_segmento_id(db: Session) -> Optional[str]:
+    global _INVERSION_SEG_ID
+    if _INVERSION_SEG_ID is None:
+        for seg_id, nombre in db.query(
+            models.TipoSegmentoGasto.id, models.TipoSegmentoGasto.nombre
+        ).all():
+            if normalize_upper_ascii(nombre) == "INVERSION":
+                _INVERSION_SEG_ID = seg_id
+                break
+    return _INVERSION_SEG_ID
 
 
 def _require_tipo_inversion(db: Session, tipo_gasto_id: str) -> models.TipoGasto:
@@ -54,8 +139,8 @@ def _require_tipo_inversion(db: Session, tipo_gasto_id: str) -> models.TipoGasto
 
     # Validación: el tipo debe pertenecer a segmento "INVERSIÓN"
     # (si todavía no lo has cargado en BD, este check te lo bloqueará)
-    seg = getattr(t, "segmento_rel", None)
-    if seg is None or normalize_upper_ascii(getattr(seg, "nombre", "")) != "INVERSION":
+    seg_id = _get_inversion_segmento_id(db)
+    if seg_id is None or t.segmento_id != seg_id:
         raise HTTPException(
             status_code=400,
             detail="El tipo indicado no pertenece al segmento INVERSIÓN",
@@ -63,103 +148,190 @@ def _require_tipo_inversion(db: Session, tipo_gasto_id: str) -> models.TipoGasto
     return t
 
 
-def _to_float(x) -> Optional[float]:
-    if x is None:
-        return None
+def _encode_cursor(row: models.Inversion) -> str:
+    """
+    Cursor opaco de keyset para el listado: (fecha_creacion, nombre, id)
+    de la última fila devuelta.
+    """
+    raw = json.dumps([row.fecha_creacion.isoformat(), row.nombre, row.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, str, str]:
     try:
-        return float(x)
+        fecha, nombre, inv_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return date.fromisoformat(fecha), nombre, inv_id
     except Exception:
-        return None
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
 
 
-def _kpi_block(aporte, retorno, meses) -> KpiBlock:
-    """
-    KPIs aproximados con 1 flujo de entrada (inicio) y 1 salida (final).
-    """
-    aporte_f = _to_float(aporte)
-    retorno_f = _to_float(retorno)
-    meses_i = int(meses) if meses is not None else None
+def _to_float(x) -> Optional[float]:
+    # Valores de columnas Numeric: siempre Decimal o None
+    return None if x is None else float(x)
+
 
-    out = KpiBlock(aporte=aporte_f, retorno_total=retorno_f, plazo_meses=meses_i)
+# Precisión para la matemática de KPIs (moic/roi) en Decimal: holgada para
+# que round() no falle con MOIC muy altos (aporte pequeño, retorno grande).
+_KPI_CONTEXT = Context(prec=40)
+_D100 = Decimal(100)
 
-    if aporte_f and aporte_f > 0 and retorno_f is not None:
-        # MOIC
-        moic = retorno_f / aporte_f
-        out.moic = round(moic, 4)
-        out.puede_calcular_moic = True
 
-        # ROI%
-        out.roi_pct = round(((retorno_f - aporte_f) / aporte_f) * 100.0, 2)
-        out.puede_calcular_roi = True
+def _to_decimal(x) -> Optional[Decimal]:
+    if x is None or isinstance(x, Decimal):
+        return x
+    return Decimal(str(x))
 
-        # IRR aproximada (solo si meses > 0)
-        if meses_i and meses_i > 0:
+
+def _kpi_values(
+    aporte: Optional[Decimal],
+    retorno: Optional[Decimal],
+    meses: Optional[int],
+) -> dict:
+    """
+    Matemática de KPIs en Decimal (los Numeric de BD ya llegan como Decimal),
+    sin modelos Pydantic, para poder reutilizarla en cálculos por lotes.
+    Solo se convierte a float en la salida. Devuelve kwargs para KpiBlock.
+    """
+    out = {"aporte": _to_float(aporte), "retorno_total": _to_float(retorno), "plazo_meses": meses}
+
+    if aporte and aporte > 0 and retorno is not None:
+        try:
+            with localcontext(_KPI_CONTEXT):
+                # MOIC
+                moic = retorno / aporte
+                out["moic"] = float(round(moic, 4))
+                out["puede_calcular_moic"] = True
+
+                # ROI%
+                out["roi_pct"] = float(round((retorno - aporte) / aporte * _D100, 2))
+                out["puede_calcular_roi"] = True
+        except InvalidOperation:
+            # Valores fuera de la precisión del contexto: KPIs no calculables
+            return out
+
+        # IRR aproximada (solo si meses > 0; potencia fraccionaria requiere moic >= 0).
+        # En float como siempre: moic ** (12/meses) se dispara con MOIC altos y
+        # plazos cortos, y no debe romper el endpoint (puede_calcular_irr=False).
+        if meses and meses > 0 and moic >= 0:
             try:
-                irr = (moic ** (12.0 / float(meses_i))) - 1.0
-                out.irr_pct_aprox = round(irr * 100.0, 2)
-                out.puede_calcular_irr = True
-            except Exception:
+                irr = float(moic) ** (12.0 / meses) - 1.0
+                out["irr_pct_aprox"] = round(irr * 100.0, 2)
+                out["puede_calcular_irr"] = True
+            except (OverflowError, ValueError, ZeroDivisionError):
                 pass
 
     return out
 
 
-def _coerce_inversion_out(row: models.Inversion) -> dict:
+def _kpi_block(aporte, retorno, meses) -> KpiBlock:
     """
-    Dict compatible con InversionOut, incluyendo mini-objetos para UI.
+    KPIs aproximados con 1 flujo de entrada (inicio) y 1 salida (final).
+
+    El KpiBlock se construye una sola vez con todos los valores (en lugar de
+    asignar campo a campo sobre el modelo).
     """
-    tipo = row.tipo_gasto
-    prov = row.proveedor
-    deal = row.dealer
-
-    return {
-        "id": row.id,
-        "user_id": row.user_id,
-        "tipo_gasto_id": row.tipo_gasto_id,
-        "proveedor_id": row.proveedor_id,
-        "dealer_id": row.dealer_id,
-        "nombre": row.nombre,
-        "descripcion": row.descripcion,
-        "estado": row.estado,
-        "fase": row.fase,
-        "fecha_creacion": row.fecha_creacion,
-        "fecha_inicio": row.fecha_inicio,
-        "fecha_objetivo_salida": row.fecha_objetivo_salida,
-        "fecha_cierre_real": row.fecha_cierre_real,
-        "moneda": row.moneda,
-        "aporte_estimado": _to_float(row.aporte_estimado),
-        "aporte_final": _to_float(row.aporte_final),
-        "retorno_esperado_total": _to_float(row.retorno_esperado_total),
-        "retorno_final_total": _to_float(row.retorno_final_total),
-        "roi_esperado_pct": _to_float(row.roi_esperado_pct),
-        "moic_esperado": _to_float(row.moic_esperado),
-        "irr_esperada_pct": _to_float(row.irr_esperada_pct),
-        "plazo_esperado_meses": row.plazo_esperado_meses,
-        "roi_final_pct": _to_float(row.roi_final_pct),
-        "moic_final": _to_float(row.moic_final),
-        "irr_final_pct": _to_float(row.irr_final_pct),
-        "plazo_final_meses": row.plazo_final_meses,
-        "notas": row.notas,
-        "created_at": row.created_at,
-        "updated_at": row.updated_at,
-        "tipo_gasto": (
-            {
-                "id": tipo.id,
-                "nombre": tipo.nombre,
-                "rama_id": getattr(tipo, "rama_id", None),
-                "segmento_id": getattr(tipo, "segmento_id", None),
-            }
-            if tipo else None
-        ),
-        "proveedor": (
-            {"id": prov.id, "nombre": prov.nombre}
-            if prov else None
-        ),
-        "dealer": (
-            {"id": deal.id, "nombre": deal.nombre}
-            if deal else None
-        ),
-    }
+    return KpiBlock(**_kpi_values(
+        _to_decimal(aporte),
+        _to_decimal(retorno),
+        int(meses) if meses is not None else None,
+    ))
+
+
+def _kpi_sql_columns(aporte, retorno, meses, prefix: str) -> list:
+    """
+    Misma matemática que _kpi_values pero como expresiones SQL (numeric en
+    Postgres), para calcular los KPIs de muchas inversiones en una query.
+    """
+    ok = and_(aporte > 0, retorno.isnot(None))
+    # NULLIF: Postgres no garantiza cortocircuito en AND; evita división por 0
+    moic = retorno / func.nullif(aporte, 0)
+    return [
+        aporte.label(f"{prefix}_aporte"),
+        retorno.label(f"{prefix}_retorno"),
+        meses.label(f"{prefix}_meses"),
+        case((ok, func.round(moic, 4))).label(f"{prefix}_moic"),
+        case((ok, func.round((moic - 1) * 100, 2))).label(f"{prefix}_roi"),
+        case(
+            (
+                and_(ok, meses > 0, moic >= 0),
+                func.round((func.power(moic, literal(12, Numeric) / meses) - 1) * 100, 2),
+            )
+        ).label(f"{prefix}_irr"),
+    ]
+
+
+def _kpi_block_from_row(r, prefix: str) -> KpiBlock:
+    moic = r[f"{prefix}_moic"]
+    roi = r[f"{prefix}_roi"]
+    irr = r[f"{prefix}_irr"]
+    return KpiBlock(
+        aporte=_to_float(r[f"{prefix}_aporte"]),
+        retorno_total=_to_float(r[f"{prefix}_retorno"]),
+        plazo_meses=r[f"{prefix}_meses"],
+        moic=_to_float(moic),
+        roi_pct=_to_float(roi),
+        irr_pct_aprox=_to_float(irr),
+        puede_calcular_moic=moic is not None,
+        puede_calcular_roi=roi is not None,
+        puede_calcular_irr=irr is not None,
+    )
+
+
+@lru_cache(maxsize=64)
+def _list_stmt(
+    by_estado: bool,
+    by_tipo: bool,
+    by_proveedor: bool,
+    by_dealer: bool,
+    with_cursor: bool,
+    with_limit: bool,
+):
+    """
+    SELECT del listado para una combinación de filtros, construido una sola
+    vez y reutilizado: los valores van como bindparams (ver listar_inversiones).
+    """
+    inv = models.Inversion
+    stmt = (
+        select(inv)
+        .options(*_INVERSION_OUT_OPTIONS)
+        .where(inv.user_id == bindparam("user_id"))
+    )
+
+    if by_estado:
+        stmt = stmt.where(inv.estado == bindparam("estado"))
+    if by_tipo:
+        stmt = stmt.where(inv.tipo_gasto_id == bindparam("tipo_gasto_id"))
+    if by_proveedor:
+        stmt = stmt.where(inv.proveedor_id == bindparam("proveedor_id"))
+    if by_dealer:
+        stmt = stmt.where(inv.dealer_id == bindparam("dealer_id"))
+
+    if with_cursor:
+        # Orden mixto (DESC, ASC, ASC): no vale un tuple_() < tuple_()
+        stmt = stmt.where(
+            or_(
+                inv.fecha_creacion < bindparam("c_fecha"),
+                and_(
+                    inv.fecha_creacion == bindparam("c_fecha"),
+                    or_(
+                        inv.nombre > bindparam("c_nombre"),
+                        and_(
+                            inv.nombre == bindparam("c_nombre"),
+                            inv.id > bindparam("c_id"),
+                        ),
+                    ),
+                ),
+            )
+        )
+
+    stmt = stmt.order_by(
+        inv.fecha_creacion.desc(),
+        inv.nombre.asc(),
+        inv.id.asc(),
+    )
+    if with_limit:
+        stmt = stmt.limit(bindparam("limit"))
+    return stmt
 
 
 # ----------------------------
@@ -172,27 +344,105 @@ def _coerce_inversion_out(row: models.Inversion) -> dict:
     summary="Listar inversiones",
 )
 def listar_inversiones(
+    response: Response,
     estado: Optional[str] = Query(None, description="ACTIVA | CERRADA | DESCARTADA"),
     tipo_gasto_id: Optional[str] = Query(None, description="Filtrar por tipo inversión (tipo_gasto.id)"),
     proveedor_id: Optional[str] = Query(None),
     dealer_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(
+        None, ge=1, le=200,
+        description="Tamaño de página (keyset). Sin limit se devuelve el listado completo.",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor devuelto en la cabecera X-Next-Cursor de la página anterior",
+    ),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
 ):
-    q = db.query(models.Inversion).filter(models.Inversion.user_id == current_user.id)
+    """
+    Lista inversiones del usuario ordenadas por fecha_creacion DESC, nombre ASC.
 
-    if estado:
-        q = q.filter(models.Inversion.estado == estado)
-    if tipo_gasto_id:
-        q = q.filter(models.Inversion.tipo_gasto_id == tipo_gasto_id)
-    if proveedor_id:
-        q = q.filter(models.Inversion.proveedor_id == proveedor_id)
-    if dealer_id:
-        q = q.filter(models.Inversion.dealer_id == dealer_id)
+    Paginación opcional por keyset (memoria O(página) y range scan sobre
+    ix_inversion_user_fecha_nombre): con `limit`, se devuelven como mucho
+    `limit` filas y, si hay más, la cabecera X-Next-Cursor trae el cursor
+    para pedir la siguiente página. El cuerpo sigue siendo una lista.
+    """
+    params = {
+        "user_id": current_user.id,
+        "estado": estado,
+        "tipo_gasto_id": tipo_gasto_id,
+        "proveedor_id": proveedor_id,
+        "dealer_id": dealer_id,
+    }
+    if cursor:
+        params["c_fecha"], params["c_nombre"], params["c_id"] = _decode_cursor(cursor)
+
+    stmt = _list_stmt(
+        bool(estado), bool(tipo_gasto_id), bool(proveedor_id), bool(dealer_id),
+        bool(cursor), limit is not None,
+    )
 
-    q = q.order_by(models.Inversion.fecha_creacion.desc(), models.Inversion.nombre.asc())
-    rows = q.all()
-    return [_coerce_inversion_out(r) for r in rows]
+    # InversionOut (from_attributes) lee columnas y relaciones directamente del ORM
+    if limit is None:
+        if cursor:
+            # Resto del listado a partir del cursor: parcial, no se cachea
+            # (no puede compartir clave con el listado completo).
+            return db.execute(stmt, params).scalars().all()
+
+        key = cache_key(
+            _list_cache_ns(current_user.id),
+            estado, tipo_gasto_id, proveedor_id, dealer_id,
+        )
+        body = cache_get(key)
+        if body is None:
+            rows = db.execute(stmt, params).scalars().all()
+            items = _LIST_ADAPTER.validate_python(rows, from_attributes=True)
+            body = _LIST_ADAPTER.dump_json(items)
+            cache_set(key, body, ttl=_LIST_CACHE_TTL)
+        return Response(content=body, media_type="application/json")
+
+    params["limit"] = limit + 1
+    rows = db.execute(stmt, params).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return rows
+
+
+@router.get(
+    "/kpis",
+    response_model=List[InversionKpisOut],
+    summary="KPIs calculados (aprox) de todas las inversiones del usuario",
+)
+def kpis_inversiones(
+    estado: Optional[str] = Query(None, description="ACTIVA | CERRADA | DESCARTADA"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_user),
+):
+    """
+    Versión por lotes de /{inversion_id}/kpis: Postgres calcula MOIC/ROI/IRR
+    de todas las filas en una sola query (sin un request ni cálculo Python
+    por inversión). Declarada antes de /{inversion_id} para que "kpis" no
+    se interprete como id.
+    """
+    inv = models.Inversion
+    q = select(
+        inv.id,
+        *_kpi_sql_columns(inv.aporte_estimado, inv.retorno_esperado_total, inv.plazo_esperado_meses, "esp"),
+        *_kpi_sql_columns(inv.aporte_final, inv.retorno_final_total, inv.plazo_final_meses, "fin"),
+    ).where(inv.user_id == current_user.id)
+    if estado:
+        q = q.where(inv.estado == estado)
+    q = q.order_by(inv.fecha_creacion.desc(), inv.nombre.asc(), inv.id.asc())
+
+    return [
+        InversionKpisOut(
+            inversion_id=r["id"],
+            esperado=_kpi_block_from_row(r, "esp"),
+            final=_kpi_block_from_row(r, "fin"),
+        )
+        for r in db.execute(q).mappings()
+    ]
 
 
 @router.get(
@@ -205,8 +455,7 @@ def get_inversion(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
 ):
-    row = _require_owned_inversion(db, inversion_id, current_user.id)
-    return _coerce_inversion_out(row)
+    return _require_owned_inversion(db, inversion_id, current_user.id, eager=True)
 
 
 @router.post(
@@ -224,15 +473,10 @@ def crear_inversion(
     _require_tipo_inversion(db, payload.tipo_gasto_id)
 
     # Validar proveedor/dealer si vienen informados (y que sean del usuario)
-    if payload.proveedor_id:
-        _require_owned_proveedor(db, payload.proveedor_id, current_user.id)
-    if payload.dealer_id:
-        _require_owned_proveedor(db, payload.dealer_id, current_user.id)
+    _require_owned_proveedores(db, [payload.proveedor_id, payload.dealer_id], current_user.id)
 
-    inv_id = gen_inversion_id()
-
-    row = models.Inversion(
-        id=inv_id,
+    values = dict(
+        id=models.gen_inversion_id(),
         user_id=current_user.id,
         tipo_gasto_id=payload.tipo_gasto_id,
         proveedor_id=payload.proveedor_id,
@@ -241,7 +485,7 @@ def crear_inversion(
         descripcion=payload.descripcion,
         estado=payload.estado or "ACTIVA",
         fase=payload.fase,
-        fecha_creacion=payload.fecha_creacion,  # si None, aplica default BD
+        fecha_creacion=payload.fecha_creacion,
         fecha_inicio=payload.fecha_inicio,
         fecha_objetivo_salida=payload.fecha_objetivo_salida,
         fecha_cierre_real=payload.fecha_cierre_real,
@@ -260,11 +504,19 @@ def crear_inversion(
         plazo_final_meses=payload.plazo_final_meses,
         notas=payload.notas,
     )
-
-    db.add(row)
+    if values["fecha_creacion"] is None:
+        del values["fecha_creacion"]  # aplica default BD (current_date)
+
+    # INSERT ... RETURNING: la fila completa (defaults de BD incluidos) vuelve
+    # en el mismo round trip; la respuesta se construye antes del commit para
+    # no recargarla (tipo/proveedor/dealer ya están en la sesión).
+    row = db.scalars(
+        insert(models.Inversion).values(**values).returning(models.Inversion)
+    ).one()
+    out = InversionOut.model_validate(row)
     db.commit()
-    db.refresh(row)
-    return _coerce_inversion_out(row)
+    invalidate(_list_cache_ns(current_user.id))
+    return out
 
 
 @router.put(
@@ -278,66 +530,53 @@ def actualizar_inversion(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
 ):
-    row = _require_owned_inversion(db, inversion_id, current_user.id)
+    changes = {}
 
     # Si cambia tipo, validarlo
     if payload.tipo_gasto_id is not None:
         _require_tipo_inversion(db, payload.tipo_gasto_id)
-        row.tipo_gasto_id = payload.tipo_gasto_id
+        changes["tipo_gasto_id"] = payload.tipo_gasto_id
 
-    # Proveedor/dealer (validar ownership si se establecen)
+    # Proveedor/dealer (validar ownership si se establecen, en una sola query)
+    _require_owned_proveedores(db, [payload.proveedor_id, payload.dealer_id], current_user.id)
     if payload.proveedor_id is not None:
-        if payload.proveedor_id:
-            _require_owned_proveedor(db, payload.proveedor_id, current_user.id)
-        row.proveedor_id = payload.proveedor_id
-
+        changes["proveedor_id"] = payload.proveedor_id or None
     if payload.dealer_id is not None:
-        if payload.dealer_id:
-            _require_owned_proveedor(db, payload.dealer_id, current_user.id)
-        row.dealer_id = payload.dealer_id
+        changes["dealer_id"] = payload.dealer_id or None
 
-    # Textos
     if payload.nombre is not None:
-        row.nombre = normalize_upper_ascii(payload.nombre)
-    if payload.descripcion is not None:
-        row.descripcion = payload.descripcion
-    if payload.notas is not None:
-        row.notas = payload.notas
-
-    # Estado/fase
-    if payload.estado is not None:
-        row.estado = payload.estado
-    if payload.fase is not None:
-        row.fase = payload.fase
-
-    # Fechas
-    for f in ["fecha_creacion", "fecha_inicio", "fecha_objetivo_salida", "fecha_cierre_real"]:
-        v = getattr(payload, f, None)
-        if getattr(payload, f, None) is not None:
-            setattr(row, f, v)
-
-    # Moneda e importes
-    for f in [
-        "moneda",
-        "aporte_estimado",
-        "aporte_final",
-        "retorno_esperado_total",
-        "retorno_final_total",
-        "roi_esperado_pct",
-        "moic_esperado",
-        "irr_esperada_pct",
-        "plazo_esperado_meses",
-        "roi_final_pct",
-        "moic_final",
-        "irr_final_pct",
-        "plazo_final_meses",
-    ]:
-        if hasattr(payload, f) and getattr(payload, f) is not None:
-            setattr(row, f, getattr(payload, f))
+        changes["nombre"] = normalize_upper_ascii(payload.nombre)
+
+    # Resto de campos: copia directa de lo informado (None = no cambiar)
+    changes.update(
+        payload.model_dump(
+            exclude_none=True,
+            exclude=_UPDATE_SPECIAL_FIELDS,
+        )
+    )
+
+    if not changes:
+        return _require_owned_inversion(db, inversion_id, current_user.id, eager=True)
+
+    # UPDATE ... WHERE (id, user_id) RETURNING: ownership + cambios + fila
+    # actualizada en un solo round trip (sin SELECT previo ni refresh).
+    row = db.scalars(
+        update(models.Inversion)
+        .where(
+            models.Inversion.id == inversion_id,
+            models.Inversion.user_id == current_user.id,
+        )
+        .values(**changes)
+        .returning(models.Inversion)
+    ).one_or_none()
+    if row is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Inversión no encontrada")
 
+    out = InversionOut.model_validate(row)
     db.commit()
-    db.refresh(row)
-    return _coerce_inversion_out(row)
+    invalidate(_list_cache_ns(current_user.id))
+    return out
 
 
 @router.delete(
@@ -353,6 +592,7 @@ def eliminar_inversion(
     row = _require_owned_inversion(db, inversion_id, current_user.id)
     db.delete(row)
     db.commit()
+    invalidate(_list_cache_ns(current_user.id))
     return None
 
 
@@ -371,12 +611,30 @@ def listar_metricas(
     current_user: models.User = Depends(require_user),
 ):
     _require_owned_inversion(db, inversion_id, current_user.id)
-    q = (
-        db.query(models.InversionMetrica)
-        .filter(models.InversionMetrica.inversion_id == inversion_id)
-        .order_by(models.InversionMetrica.created_at.desc(), models.InversionMetrica.id.desc())
+
+    # Filas de columnas (sin objetos ORM ni InversionMetricaOut por fila),
+    # serializadas a JSON en una sola llamada. valor_num se castea a float
+    # en SQL para que salga como número (Numeric -> Decimal saldría string).
+    m = models.InversionMetrica
+    rows = db.execute(
+        select(
+            m.id,
+            m.inversion_id,
+            m.escenario,
+            m.clave,
+            cast(m.valor_num, Float).label("valor_num"),
+            m.valor_texto,
+            m.unidad,
+            m.origen,
+            m.created_at,
+        )
+        .where(m.inversion_id == inversion_id)
+        .order_by(m.created_at.desc(), m.id.desc())
+    ).mappings().all()
+    return Response(
+        content=_ROWS_ADAPTER.dump_json([dict(r) for r in rows]),
+        media_type="application/json",
     )
-    return q.all()
 
 
 @router.post(
@@ -396,19 +654,68 @@ def crear_metrica(
     if payload.valor_num is None and (payload.valor_texto is None or payload.valor_texto.strip() == ""):
         raise HTTPException(status_code=400, detail="Debe informar valor_num o valor_texto")
 
-    row = models.InversionMetrica(
-        inversion_id=inversion_id,
-        escenario=payload.escenario,
-        clave=payload.clave,
-        valor_num=payload.valor_num,
-        valor_texto=payload.valor_texto,
-        unidad=payload.unidad,
-        origen=payload.origen,
-    )
-    db.add(row)
+    row = db.scalars(
+        insert(models.InversionMetrica)
+        .values(
+            inversion_id=inversion_id,
+            escenario=payload.escenario,
+            clave=payload.clave,
+            valor_num=payload.valor_num,
+            valor_texto=payload.valor_texto,
+            unidad=payload.unidad,
+            origen=payload.origen,
+        )
+        .returning(models.InversionMetrica)
+    ).one()
+    out = InversionMetricaOut.model_validate(row)
     db.commit()
-    db.refresh(row)
-    return row
+    return out
+
+
+@router.post(
+    "/{inversion_id}/metricas/bulk",
+    response_model=List[InversionMetricaOut],
+    status_code=status.HTTP_201_CREATED,
+    summary="Añadir varias métricas a una inversión (un solo INSERT)",
+)
+def crear_metricas_bulk(
+    inversion_id: str,
+    payloads: List[InversionMetricaIn],
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_user),
+):
+    _require_owned_inversion(db, inversion_id, current_user.id)
+
+    for payload in payloads:
+        if payload.valor_num is None and (payload.valor_texto is None or payload.valor_texto.strip() == ""):
+            raise HTTPException(status_code=400, detail="Debe informar valor_num o valor_texto")
+
+    if not payloads:
+        return []
+
+    # executemany con RETURNING: psycopg agrupa las filas en INSERT ... VALUES (...), (...).
+    # Postgres no garantiza el orden de RETURNING en un VALUES multi-fila:
+    # sort_by_parameter_order devuelve las filas en el orden de payloads.
+    rows = db.scalars(
+        insert(models.InversionMetrica).returning(
+            models.InversionMetrica, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "inversion_id": inversion_id,
+                "escenario": p.escenario,
+                "clave": p.clave,
+                "valor_num": p.valor_num,
+                "valor_texto": p.valor_texto,
+                "unidad": p.unidad,
+                "origen": p.origen,
+            }
+            for p in payloads
+        ],
+    ).all()
+    out = [InversionMetricaOut.model_validate(r) for r in rows]
+    db.commit()
+    return out
 
 
 @router.delete(
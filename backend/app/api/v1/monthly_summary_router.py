@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
 from datetime import date
+from functools import lru_cache
+from itertools import chain
 from typing import Optional, List, Tuple
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Integer  # ✅ Cast a Integer para evitar overflow SMALLINT
+from sqlalchemy import Integer, and_, bindparam, case, event, exists, func, select, true, tuple_
 
 from backend.app.schemas.monthly_summary import (
     MonthlySummaryResponse,
@@ -19,9 +23,10 @@ from backend.app.schemas.monthly_summary import (
     MonthlyResumenNota,
     MonthlyPresupuestos,
 )
-from backend.app.db.models import Ingreso, Gasto, GastoCotidiano, CierreMensual, User
-from backend.app.api.v1.auth_router import require_user
+from backend.app.db.models import Ingreso, Gasto, GastoCotidiano, CierreMensual
+from backend.app.api.v1.auth_router import require_user_id
 from backend.app.db.session import get_db
+from backend.app.utils.cache import cache_get, cache_key, cache_set, invalidate, is_shared
 
 router = APIRouter()
 
@@ -30,30 +35,109 @@ SEGMENTO_COTIDIANO_ID = "COT-12345"
 
 # Periodicidad de extras (normalizada)
 PERIODICIDAD_PAGO_UNICO = "PAGO UNICO"
-PERIODICIDAD_PAGO_UNICO_ALT = "PAGO ÚNICO"  # legacy por si existiera en BBDD
+PERIODICIDAD_PAGO_UNICO_ALT = "PAGO ÚNICO"  # legacy: gastos_router ya no la escribe (filas antiguas)
 
+# Predicados fijos del resumen (no dependen del mes ni del usuario).
+# Se construyen una vez y se reutilizan en todos los agregados, de modo que
+# el SQL generado es idéntico en cada CASE que los usa.
+_INGRESO_ACTIVO_KPI = and_(Ingreso.activo.is_(True), Ingreso.kpi.is_(True))
+_INGRESO_RECURRENTE = Ingreso.periodicidad != PERIODICIDAD_PAGO_UNICO
+_INGRESO_EXTRA = Ingreso.periodicidad == PERIODICIDAD_PAGO_UNICO
 
-def _get_month_range(year: Optional[int], month: Optional[int]) -> Tuple[date, date]:
+_GASTO_ACTIVO_KPI = and_(Gasto.activo.is_(True), Gasto.kpi.is_(True))
+_GASTO_GESTIONABLE = Gasto.segmento_id != SEGMENTO_COTIDIANO_ID
+_GASTO_COTIDIANO = Gasto.segmento_id == SEGMENTO_COTIDIANO_ID
+_GASTO_RECURRENTE = Gasto.periodicidad != PERIODICIDAD_PAGO_UNICO
+_GASTO_EXTRA = Gasto.periodicidad.in_([PERIODICIDAD_PAGO_UNICO, PERIODICIDAD_PAGO_UNICO_ALT])
+
+# Caché del resumen (bytes JSON) por (user_id, anio, mes):
+# - mes en curso (o futuro): TTL corto, los datos cambian a diario
+# - meses pasados: TTL largo; cualquier escritura del usuario invalida igualmente
+MSUM_TTL_CURRENT = 30
+MSUM_TTL_PAST = 86400
+# - meses ya cerrados (hay fila en cierre_mensual): inmutables salvo escritura
+MSUM_TTL_CLOSED = 30 * 86400
+# Los TTL largos dependen de que invalidate() llegue a todos los workers, es
+# decir, de Redis. Con la caché en memoria (por proceso) se limitan al del
+# mes en curso: otro worker serviría el resumen viejo hasta que caduque.
+
+# Tablas de las que sale el resumen: una escritura en ellas invalida la caché
+_MSUM_SOURCES = (Ingreso, Gasto, GastoCotidiano, CierreMensual)
+
+
+_RESPONSE_ADAPTER = TypeAdapter(MonthlySummaryResponse)
+
+
+def _msum_cache_ns(user_id: int) -> str:
+    return f"msum:{user_id}"
+
+
+def invalidate_monthly_summary_cache(user_id: int) -> None:
+    """
+    Invalida los resúmenes cacheados del usuario.
+
+    Las escrituras ORM normales (add/delete/mutar + commit) ya invalidan
+    solas vía los eventos de abajo. Las que no pasan por el unit of work
+    (insert/update/delete de Core, p.ej. pg_insert(...).returning()) deben
+    llamar a esta función tras el commit.
+    """
+    invalidate(_msum_cache_ns(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_msum_users(session: Session, flush_context) -> None:
+    """
+    Apunta los usuarios cuyos datos de resumen se han tocado en este flush.
+    (En after_flush new/dirty/deleted aún reflejan lo que se ha escrito.)
+
+    Ojo: solo ve objetos del unit of work; ver invalidate_monthly_summary_cache.
+    """
+    touched = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _MSUM_SOURCES) and obj.user_id is not None:
+            if touched is None:
+                touched = session.info.setdefault("msum_users", set())
+            touched.add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_msum_users(session: Session) -> None:
+    # Sólo tras el commit: invalidar antes permitiría re-cachear datos viejos
+    for user_id in session.info.pop("msum_users", ()):
+        invalidate(_msum_cache_ns(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_msum_users(session: Session) -> None:
+    session.info.pop("msum_users", None)
+
+
+# Nombres de mes para mes_label: fijos, sin depender del locale del proceso
+_MESES_ES = (
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
+)
+
+
+@lru_cache(maxsize=512)
+def _month_meta(y: int, m: int) -> Tuple[date, date, str]:
     """
-    Devuelve el rango [ini, fin_excl) del mes solicitado.
+    Devuelve (ini, fin_excl, mes_label) del mes (y, m), memoizado.
 
     - ini: primer día del mes
     - fin_excl: primer día del mes siguiente (fin exclusivo)
+    - mes_label: p.ej. "Diciembre 2025" (ver _MESES_ES)
 
     Usamos fin_excl para filtros SQL robustos:
       fecha >= ini AND fecha < fin_excl
     """
-    today = date.today()
-    y = year or today.year
-    m = month or today.month
-
     ini = date(y, m, 1)
     if m == 12:
         fin_excl = date(y + 1, 1, 1)
     else:
         fin_excl = date(y, m + 1, 1)
 
-    return ini, fin_excl
+    return ini, fin_excl, f"{_MESES_ES[m - 1]} {y}"
 
 
 def _add_months(y: int, m: int, delta: int) -> Tuple[int, int]:
@@ -73,388 +157,80 @@ def _add_months(y: int, m: int, delta: int) -> Tuple[int, int]:
     return y2, m2
 
 
-@router.get(
-    "/analytics/monthly-summary",
-    response_model=MonthlySummaryResponse,
-    name="monthly_summary_get",
-)
-def get_monthly_summary(
-    year: Optional[int] = Query(None, description="Año (por defecto, año actual)"),
-    month: Optional[int] = Query(None, description="Mes 1-12 (por defecto, mes actual)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
-) -> MonthlySummaryResponse:
+def _json_response(request: Request, body: bytes) -> Response:
     """
-    Resumen mensual de ingresos y gastos (alineado con Home):
-
-    INGRESOS
-    - REAL recurrentes: activo+kpi+cobrados dentro del mes, periodicidad != PAGO UNICO
-    - REAL extras: cobrados dentro del mes, periodicidad = PAGO UNICO (sin filtrar activo/kpi)
-    - PRESUPUESTO ingresos: activo+kpi, periodicidad != PAGO UNICO (extras NO se presupuestan)
-
-    GASTOS
-    - PRESUPUESTO gestionables: activo+kpi, segmento != COT, periodicidad != PAGO UNICO (extras NO se presupuestan)
-    - PRESUPUESTO cotidianos: activo+kpi, segmento = COT
-    - REAL gestionables recurrentes: pagados en mes, segmento != COT, periodicidad != PAGO UNICO (SIN filtros activo/kpi)
-    - REAL gestionables extras: pagados en mes, segmento != COT, periodicidad = PAGO UNICO (incluye legacy PAGO ÚNICO)
-    - REAL cotidianos: gasto_cotidiano pagado en mes
-    - REAL gastos_mes: gestionables_recurrentes + gestionables_extras + cotidianos
+    Respuesta JSON con ETag (hash del contenido) y soporte de If-None-Match.
 
-    NOTA SOBRE "vs media 12m" y "run rate 12m":
-    - Ambos se calculan contra los 12 cierres ANTERIORES al mes objetivo.
-    - Esto evita "contaminar" la media incluyendo el propio mes objetivo.
+    Si el cliente ya tiene esta misma versión devolvemos 304 sin cuerpo.
+    Cache-Control "private, no-cache": el cliente puede guardarla pero debe
+    revalidar siempre; así una escritura (que invalida la caché del servidor)
+    se ve en la siguiente petición, y si nada cambió sólo viaja el 304.
     """
-    ini, fin_excl = _get_month_range(year, month)
-    anio = ini.year
-    mes = ini.month
-    mes_label = ini.strftime("%B %Y").capitalize()
-
-    # -------------------------------------------------------------------------
-    # ✅ Ventana 12 meses (benchmark) CORRECTA Y SIN OVERFLOW
-    #
-    # Queremos los 12 cierres anteriores al mes objetivo:
-    #   end = mes objetivo - 1
-    #   start = end - 11
-    #
-    # Ej (mes objetivo = 2025-12):
-    #   end = 2025-11
-    #   start = 2024-12
-    #   => 12 meses: 202412..202511
-    # -------------------------------------------------------------------------
-    end_y, end_m = _add_months(anio, mes, -1)
-    start_y, start_m = _add_months(end_y, end_m, -11)
-
-    end_ym = int(end_y) * 100 + int(end_m)
-    start_ym = int(start_y) * 100 + int(start_m)
-
-    # period_ym como INTEGER evita overflow de SMALLINT en expresiones (ej 202512)
-    period_ym = cast(CierreMensual.anio, Integer) * 100 + cast(CierreMensual.mes, Integer)
-
-    # -------------------------------------------------------------------------
-    # 1) INGRESOS (REAL + PRESUPUESTO)
-    # -------------------------------------------------------------------------
-
-    # (REAL) Recurrentes KPI del mes (excluye PAGO UNICO)
-    ingresos_recurrentes_mes = float(
-        (
-            db.query(func.coalesce(func.sum(Ingreso.importe), 0.0))
-            .filter(
-                Ingreso.user_id == current_user.id,
-                Ingreso.activo == True,  # noqa: E712
-                Ingreso.kpi == True,  # noqa: E712
-                Ingreso.cobrado == True,  # noqa: E712
-                Ingreso.periodicidad != PERIODICIDAD_PAGO_UNICO,
-                Ingreso.ultimo_ingreso_on >= ini,
-                Ingreso.ultimo_ingreso_on < fin_excl,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    # (PRESUPUESTO) ingresos recurrentes (excluye PAGO UNICO)
-    presupuesto_ingresos = float(
-        (
-            db.query(func.coalesce(func.sum(Ingreso.importe), 0.0))
-            .filter(
-                Ingreso.user_id == current_user.id,
-                Ingreso.activo == True,  # noqa: E712
-                Ingreso.kpi == True,  # noqa: E712
-                Ingreso.periodicidad != PERIODICIDAD_PAGO_UNICO,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    # (REAL) extras cobrados en el mes (PAGO UNICO)
-    ingresos_extra_importe, ingresos_extra_num = (
-        db.query(
-            func.coalesce(func.sum(Ingreso.importe), 0.0),
-            func.count(Ingreso.id),
-        )
-        .filter(
-            Ingreso.user_id == current_user.id,
-            Ingreso.cobrado == True,  # noqa: E712
-            Ingreso.periodicidad == PERIODICIDAD_PAGO_UNICO,
-            Ingreso.ultimo_ingreso_on >= ini,
-            Ingreso.ultimo_ingreso_on < fin_excl,
-        )
-        .first()
-        or (0.0, 0)
-    )
-    ingresos_extra_importe = float(ingresos_extra_importe or 0.0)
-    ingresos_extra_num = int(ingresos_extra_num or 0)
-
-    ingresos_mes = ingresos_recurrentes_mes + ingresos_extra_importe
-
-    # -------------------------------------------------------------------------
-    # 2) PRESUPUESTOS DE GASTO (NO incluyen extras)
-    # -------------------------------------------------------------------------
-
-    # Gestionables presupuestados (excluye PAGO UNICO)
-    presupuesto_gestionables = float(
-        (
-            db.query(func.coalesce(func.sum(Gasto.importe_cuota), 0.0))
-            .filter(
-                Gasto.user_id == current_user.id,
-                Gasto.activo == True,  # noqa: E712
-                Gasto.kpi == True,  # noqa: E712
-                Gasto.segmento_id != SEGMENTO_COTIDIANO_ID,
-                Gasto.periodicidad != PERIODICIDAD_PAGO_UNICO,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    # Cotidianos presupuestados
-    presupuesto_cotidianos = float(
-        (
-            db.query(func.coalesce(func.sum(Gasto.importe_cuota), 0.0))
-            .filter(
-                Gasto.user_id == current_user.id,
-                Gasto.activo == True,  # noqa: E712
-                Gasto.kpi == True,  # noqa: E712
-                Gasto.segmento_id == SEGMENTO_COTIDIANO_ID,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    gasto_total_presupuesto = presupuesto_gestionables + presupuesto_cotidianos
-
-    presupuestos = MonthlyPresupuestos(
-        ingresos_presupuesto=presupuesto_ingresos,
-        gestionables_presupuesto=presupuesto_gestionables,
-        cotidianos_presupuesto=presupuesto_cotidianos,
-        gasto_total_presupuesto=gasto_total_presupuesto,
-    )
-
-    # -------------------------------------------------------------------------
-    # 3) GASTOS REALES (consumidos)
-    # -------------------------------------------------------------------------
-    # Importante: NO filtramos por activo/kpi en consumidos gestionables.
-
-    # Gestionables recurrentes consumidos (excluye PAGO UNICO)
-    consumidos_gestionables_recurrentes = float(
-        (
-            db.query(func.coalesce(func.sum(Gasto.importe_cuota), 0.0))
-            .filter(
-                Gasto.user_id == current_user.id,
-                Gasto.pagado == True,  # noqa: E712
-                Gasto.ultimo_pago_on >= ini,
-                Gasto.ultimo_pago_on < fin_excl,
-                Gasto.segmento_id != SEGMENTO_COTIDIANO_ID,
-                Gasto.periodicidad != PERIODICIDAD_PAGO_UNICO,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    # Gestionables extras consumidos (PAGO UNICO / PAGO ÚNICO)
-    gastos_extra_importe, gastos_extra_num = (
-        db.query(
-            func.coalesce(func.sum(Gasto.importe_cuota), 0.0),
-            func.count(Gasto.id),
-        )
-        .filter(
-            Gasto.user_id == current_user.id,
-            Gasto.pagado == True,  # noqa: E712
-            Gasto.ultimo_pago_on >= ini,
-            Gasto.ultimo_pago_on < fin_excl,
-            Gasto.segmento_id != SEGMENTO_COTIDIANO_ID,
-            Gasto.periodicidad.in_([PERIODICIDAD_PAGO_UNICO, PERIODICIDAD_PAGO_UNICO_ALT]),
-        )
-        .first()
-        or (0.0, 0)
-    )
-    gastos_extra_importe = float(gastos_extra_importe or 0.0)
-    gastos_extra_num = int(gastos_extra_num or 0)
-
-    # Total gestionables consumidos
-    consumidos_gestionables_total = consumidos_gestionables_recurrentes + gastos_extra_importe
-
-    # Cotidianos consumidos (pagado = true)
-    consumidos_cotidianos = float(
-        (
-            db.query(func.coalesce(func.sum(GastoCotidiano.importe), 0.0))
-            .filter(
-                GastoCotidiano.user_id == current_user.id,
-                GastoCotidiano.pagado == True,  # noqa: E712
-                GastoCotidiano.fecha >= ini,
-                GastoCotidiano.fecha < fin_excl,
-            )
-        ).scalar()
-        or 0.0
-    )
-
-    # Gastos totales reales del mes (sin doble contar extras)
-    gastos_mes = consumidos_gestionables_total + consumidos_cotidianos
-
-    # -------------------------------------------------------------------------
-    # 4) KPIs generales
-    # -------------------------------------------------------------------------
-
-    ahorro_mes = ingresos_mes - gastos_mes
-
-    # Media 12m: 12 cierres ANTERIORES al mes objetivo (start_ym..end_ym)
-    cierres_12m_q = (
-        db.query(
-            func.coalesce(func.avg(CierreMensual.ingresos_reales), 0.0),
-            func.coalesce(func.avg(CierreMensual.gastos_reales_total), 0.0),
-        )
-        .filter(
-            CierreMensual.user_id == current_user.id,
-            period_ym >= start_ym,
-            period_ym <= end_ym,
-        )
-    )
-
-    ingresos_media_12m, gastos_media_12m = cierres_12m_q.first() or (0.0, 0.0)
-    ingresos_media_12m = float(ingresos_media_12m or 0.0)
-    gastos_media_12m = float(gastos_media_12m or 0.0)
-
-    ingresos_vs_media_pct = (
-        ((ingresos_mes - ingresos_media_12m) / ingresos_media_12m * 100.0)
-        if ingresos_media_12m > 0
-        else None
-    )
-    gastos_vs_media_pct = (
-        ((gastos_mes - gastos_media_12m) / gastos_media_12m * 100.0)
-        if gastos_media_12m > 0
-        else None
-    )
-
-    general = MonthlyGeneralKpi(
-        ingresos_mes=ingresos_mes,
-        gastos_mes=gastos_mes,
-        ahorro_mes=ahorro_mes,
-        ingresos_vs_media_12m_pct=ingresos_vs_media_pct,
-        gastos_vs_media_12m_pct=gastos_vs_media_pct,
-    )
-
-    # -------------------------------------------------------------------------
-    # 5) Detalle ingresos / gastos
-    # -------------------------------------------------------------------------
-
-    detalle_ingresos = MonthlyIngresosDetalle(
-        recurrentes=ingresos_recurrentes_mes,
-        extraordinarios=ingresos_extra_importe,
-        num_extra=ingresos_extra_num,
-    )
-
-    detalle_gastos = MonthlyGastosDetalle(
-        recurrentes=consumidos_gestionables_recurrentes,
-        extraordinarios=gastos_extra_importe,
-        num_extra=gastos_extra_num,
-    )
-
-    # -------------------------------------------------------------------------
-    # 6) Distribuciones
-    # -------------------------------------------------------------------------
-
-    distribucion_ingresos: List[MonthlyDistribucionItem] = []
-    if ingresos_mes > 0:
-        if detalle_ingresos.recurrentes > 0:
-            distribucion_ingresos.append(
-                MonthlyDistribucionItem(
-                    label="Recurrentes",
-                    importe=detalle_ingresos.recurrentes,
-                    porcentaje_sobre_total=(detalle_ingresos.recurrentes / ingresos_mes * 100.0),
-                )
-            )
-        if detalle_ingresos.extraordinarios > 0:
-            distribucion_ingresos.append(
-                MonthlyDistribucionItem(
-                    label="Extraordinarios",
-                    importe=detalle_ingresos.extraordinarios,
-                    porcentaje_sobre_total=(detalle_ingresos.extraordinarios / ingresos_mes * 100.0),
-                )
-            )
-
-    distribucion_gastos: List[MonthlyDistribucionItem] = []
-    if gastos_mes > 0:
-        if consumidos_gestionables_recurrentes > 0:
-            distribucion_gastos.append(
-                MonthlyDistribucionItem(
-                    label="Gestionables",
-                    importe=consumidos_gestionables_recurrentes,
-                    porcentaje_sobre_total=(consumidos_gestionables_recurrentes / gastos_mes * 100.0),
-                )
-            )
-        if gastos_extra_importe > 0:
-            distribucion_gastos.append(
-                MonthlyDistribucionItem(
-                    label="Extraordinarios",
-                    importe=gastos_extra_importe,
-                    porcentaje_sobre_total=(gastos_extra_importe / gastos_mes * 100.0),
-                )
-            )
-        if consumidos_cotidianos > 0:
-            distribucion_gastos.append(
-                MonthlyDistribucionItem(
-                    label="Cotidianos",
-                    importe=consumidos_cotidianos,
-                    porcentaje_sobre_total=(consumidos_cotidianos / gastos_mes * 100.0),
-                )
-            )
-
-    # -------------------------------------------------------------------------
-    # 7) Run rate 12 meses
-    # -------------------------------------------------------------------------
-
-    # Run rate: promedio de los 12 cierres ANTERIORES (no incluye el mes objetivo)
-    cierres_det_q = (
-        db.query(
-            func.coalesce(func.avg(CierreMensual.ingresos_reales), 0.0),
-            func.coalesce(func.avg(CierreMensual.gastos_reales_total), 0.0),
-            func.coalesce(func.avg(CierreMensual.resultado_real), 0.0),
-            func.count(CierreMensual.id),
-        )
-        .filter(
-            CierreMensual.user_id == current_user.id,
-            period_ym >= start_ym,
-            period_ym <= end_ym,
-        )
-    )
-
-    ingreso_medio_12m, gasto_medio_12m, ahorro_medio_12m, meses_usados = (
-        cierres_det_q.first() or (0.0, 0.0, 0.0, 0)
-    )
-    ingreso_medio_12m = float(ingreso_medio_12m or 0.0)
-    gasto_medio_12m = float(gasto_medio_12m or 0.0)
-    ahorro_medio_12m = float(ahorro_medio_12m or 0.0)
-    meses_usados = int(meses_usados or 0)
-
-    run_rate_12m: Optional[MonthlyRunRate] = None
-    if meses_usados > 0:
-        run_rate_12m = MonthlyRunRate(
-            ingreso_medio_12m=ingreso_medio_12m,
-            gasto_medio_12m=gasto_medio_12m,
-            ahorro_medio_12m=ahorro_medio_12m,
-            proyeccion_ahorro_anual=ahorro_medio_12m * 12.0,
-            meses_usados=meses_usados,
-        )
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _distribucion(
+    total: float,
+    items: Tuple[Tuple[str, float, Optional[float]], ...],
+) -> List[MonthlyDistribucionItem]:
+    """
+    Items de distribución a partir de candidatos (label, importe, %).
 
-    # -------------------------------------------------------------------------
-    # 8) Alertas e Insight (ANTES: notas)
-    # -------------------------------------------------------------------------
-    #
-    # Objetivo:
-    # - Dar señales accionables sin generar "spam".
-    # - Mantener compatibilidad: se devuelve la lista `notas` como antes.
-    #
-    # Convención de tipo:
-    # - WARNING: requiere atención
-    # - SUCCESS: señal positiva
-    # - INFO: insight informativo
-    # -------------------------------------------------------------------------
+    - total <= 0: lista vacía sin construir nada.
+    - Sólo entran los candidatos con importe > 0.
+    """
+    if total <= 0:
+        return []
+    return [
+        MonthlyDistribucionItem.model_construct(label=label, importe=importe, porcentaje_sobre_total=pct)
+        for label, importe, pct in items
+        if importe > 0
+    ]
+
+
+# Formateo de porcentajes en las notas (1 decimal); método ligado, reutilizado
+_fmt1 = "{:.1f}".format
+
+
+def _build_notas(
+    row,
+    *,
+    ingresos_mes: float,
+    gastos_mes: float,
+    ahorro_mes: float,
+    ingresos_vs_media_pct: Optional[float],
+    gastos_vs_media_pct: Optional[float],
+    ingresos_extra_importe: float,
+    gastos_extra_importe: float,
+    gasto_total_presupuesto: float,
+    presupuesto_cotidianos: float,
+    consumidos_cotidianos: float,
+) -> List[MonthlyResumenNota]:
+    """
+    Alertas e insights del mes (sección 8 de get_monthly_summary).
 
+    Separado del handler para poder omitirlo cuando el cliente no pide notas
+    (parámetro `fields`). `row` es la fila de _MONTHLY_SUMMARY_STMT (porcentajes
+    ya calculados en SQL).
+    """
     notas: List[MonthlyResumenNota] = []
+    titulos_vistos: set = set()
 
     def add_note(tipo: str, titulo: str, mensaje: str) -> None:
-        # Evita duplicados por título (simple y suficiente)
-        if any(n.titulo == titulo for n in notas):
+        # Evita duplicados por título
+        if titulo in titulos_vistos:
             return
-        notas.append(MonthlyResumenNota(tipo=tipo, titulo=titulo, mensaje=mensaje))
+        titulos_vistos.add(titulo)
+        notas.append(MonthlyResumenNota.model_construct(tipo=tipo, titulo=titulo, mensaje=mensaje))
 
     # 8.1) Situaciones base
     if ingresos_mes <= 0 and gastos_mes > 0:
@@ -503,18 +279,18 @@ def get_monthly_summary(
 
     # 8.3) Peso de extraordinarios (gastos)
     if gastos_mes > 0 and gastos_extra_importe > 0:
-        pct_extra_gastos = (gastos_extra_importe / gastos_mes) * 100.0
+        pct_extra_gastos = row.pct_gas_extra
         if pct_extra_gastos >= 35:
             add_note(
                 "WARNING",
                 "Mucho gasto extraordinario",
-                f"Los gastos extraordinarios representan aprox. un {pct_extra_gastos:.1f}% del total de gastos del mes.",
+                f"Los gastos extraordinarios representan aprox. un {_fmt1(pct_extra_gastos)}% del total de gastos del mes.",
             )
         else:
             add_note(
                 "INFO",
                 "Gastos extraordinarios presentes",
-                f"Este mes has tenido gastos extraordinarios (aprox. {pct_extra_gastos:.1f}% del total).",
+                f"Este mes has tenido gastos extraordinarios (aprox. {_fmt1(pct_extra_gastos)}% del total).",
             )
 
     # 8.4) Presupuesto vs real (si hay presupuesto > 0)
@@ -524,13 +300,13 @@ def get_monthly_summary(
             add_note(
                 "WARNING",
                 "Gasto por encima del presupuesto",
-                f"Este mes has gastado aprox. un +{desviacion_gasto_pct:.1f}% sobre el presupuesto.",
+                f"Este mes has gastado aprox. un +{_fmt1(desviacion_gasto_pct)}% sobre el presupuesto.",
             )
         elif desviacion_gasto_pct < -10:
             add_note(
                 "SUCCESS",
                 "Gasto por debajo del presupuesto",
-                f"Buen control: este mes estás aprox. un {desviacion_gasto_pct:.1f}% por debajo del presupuesto.",
+                f"Buen control: este mes estás aprox. un {_fmt1(desviacion_gasto_pct)}% por debajo del presupuesto.",
             )
 
     if presupuesto_cotidianos > 0:
@@ -539,16 +315,16 @@ def get_monthly_summary(
             add_note(
                 "WARNING",
                 "Cotidianos por encima del presupuesto",
-                f"Los gastos cotidianos van aprox. un +{desviacion_cot_pct:.1f}% sobre el presupuesto.",
+                f"Los gastos cotidianos van aprox. un +{_fmt1(desviacion_cot_pct)}% sobre el presupuesto.",
             )
 
     # 8.5) Insight general: ratio gastos/ingresos (solo si ingresos > 0)
     if ingresos_mes > 0:
-        ratio_gasto = (gastos_mes / ingresos_mes) * 100.0
+        ratio_gasto = row.ratio_gasto_pct
         add_note(
             "INFO",
             "Ratio de gasto sobre ingresos",
-            f"Has destinado aproximadamente un {ratio_gasto:.1f}% de tus ingresos a gastos este mes.",
+            f"Has destinado aproximadamente un {_fmt1(ratio_gasto)}% de tus ingresos a gastos este mes.",
         )
 
         # Señal extra: eficiencia de gasto
@@ -561,11 +337,11 @@ def get_monthly_summary(
 
     # 8.6) Insight por ingresos extraordinarios (si existen)
     if ingresos_mes > 0 and ingresos_extra_importe > 0:
-        pct_extra_ing = (ingresos_extra_importe / ingresos_mes) * 100.0
+        pct_extra_ing = row.pct_ing_extra
         add_note(
             "INFO",
             "Ingresos extraordinarios",
-            f"Este mes has tenido ingresos extraordinarios (aprox. {pct_extra_ing:.1f}% del total).",
+            f"Este mes has tenido ingresos extraordinarios (aprox. {_fmt1(pct_extra_ing)}% del total).",
         )
 
     # Limitar cantidad para evitar saturación (orden actual ya prioriza WARNING/SUCCESS primero)
@@ -574,23 +350,458 @@ def get_monthly_summary(
     if len(notas) > MAX_NOTAS:
         notas = notas[:MAX_NOTAS]
 
+    return notas
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[bool, bool]:
+    """
+    Interpreta el parámetro `fields` (CSV) -> (con_distribucion, con_notas).
+
+    - None / vacío / "all": respuesta completa (comportamiento por defecto).
+    - Cualquier otra lista: sólo se construyen las secciones opcionales
+      nombradas ("distribucion", "notas"); las demás salen como [].
+      KPIs, detalle, presupuestos y run rate van siempre (salen de la misma
+      consulta y no cuestan nada extra).
+    """
+    if not fields:
+        return True, True
+    secciones = {f.strip().lower() for f in fields.split(",") if f.strip()}
+    if not secciones or "all" in secciones:
+        return True, True
+    return "distribucion" in secciones, "notas" in secciones
+
+
+def _build_monthly_summary_stmt():
+    """
+    Construye (una vez, al importar el módulo) UNA sola sentencia (CTEs de una fila cada una) que devuelve
+    todos los subtotales del mes y los KPIs derivados:
+
+    - ing: agregación condicional sobre Ingreso
+    - gas: agregación condicional sobre Gasto (presupuestos + consumidos)
+    - cot: gastos cotidianos pagados en el mes
+    - cie: medias de los 12 cierres [start..end]
+
+    (Nombres de CTE cortos para no tapar las tablas ingresos/gastos.)
+
+    Los agregados sólo leen columnas incluidas en ix_ingreso_user_fecha,
+    ix_gasto_user_pago e ix_gasto_cot_user_fecha (index-only scan); por eso
+    los COUNT son count(*).
+
+    La SELECT final cruza las cuatro filas y calcula en SQL ahorro, % vs media,
+    ratio de gasto y porcentajes de distribución; Python sólo monta los modelos.
+
+    Todo lo que varía por petición va en bindparams:
+      user_id, ini, fin_excl, anio, mes, start_y, start_m, end_y, end_m
+    """
+    user_id = bindparam("user_id")
+    ini = bindparam("ini")
+    fin_excl = bindparam("fin_excl")
+    start = (bindparam("start_y", type_=Integer), bindparam("start_m", type_=Integer))
+    end = (bindparam("end_y", type_=Integer), bindparam("end_m", type_=Integer))
+
+    # -------------------------------------------------------------------------
+    # INGRESOS: cada subtotal es un SUM(importe) FILTER (WHERE <filtro>)
+    # -------------------------------------------------------------------------
+    ingreso_en_mes = and_(
+        Ingreso.cobrado.is_(True),
+        Ingreso.ultimo_ingreso_on >= ini,
+        Ingreso.ultimo_ingreso_on < fin_excl,
+    )
+
+    ing = (
+        select(
+            # (REAL) Recurrentes KPI del mes (excluye PAGO UNICO)
+            func.coalesce(
+                func.sum(Ingreso.importe).filter(and_(_INGRESO_ACTIVO_KPI, _INGRESO_RECURRENTE, ingreso_en_mes)),
+                0.0,
+            ).label("ing_recurrentes"),
+            # (PRESUPUESTO) ingresos recurrentes (excluye PAGO UNICO)
+            func.coalesce(
+                func.sum(Ingreso.importe).filter(and_(_INGRESO_ACTIVO_KPI, _INGRESO_RECURRENTE)),
+                0.0,
+            ).label("ing_presupuesto"),
+            # (REAL) extras cobrados en el mes (PAGO UNICO)
+            func.coalesce(
+                func.sum(Ingreso.importe).filter(and_(_INGRESO_EXTRA, ingreso_en_mes)),
+                0.0,
+            ).label("ing_extra_importe"),
+            func.count().filter(and_(_INGRESO_EXTRA, ingreso_en_mes)).label("ing_extra_num"),
+        )
+        .where(Ingreso.user_id == user_id)
+        .cte("ing")
+    )
+
+    # -------------------------------------------------------------------------
+    # GASTOS: presupuestos (sin extras) + consumidos gestionables.
+    # Importante: NO filtramos por activo/kpi en consumidos gestionables.
+    # -------------------------------------------------------------------------
+    gasto_pagado_en_mes = and_(
+        Gasto.pagado.is_(True),
+        Gasto.ultimo_pago_on >= ini,
+        Gasto.ultimo_pago_on < fin_excl,
+    )
+
+    gas = (
+        select(
+            # Gestionables presupuestados (excluye PAGO UNICO)
+            func.coalesce(
+                func.sum(Gasto.importe_cuota).filter(and_(_GASTO_ACTIVO_KPI, _GASTO_GESTIONABLE, _GASTO_RECURRENTE)),
+                0.0,
+            ).label("gas_presupuesto_gestionables"),
+            # Cotidianos presupuestados
+            func.coalesce(
+                func.sum(Gasto.importe_cuota).filter(and_(_GASTO_ACTIVO_KPI, _GASTO_COTIDIANO)),
+                0.0,
+            ).label("gas_presupuesto_cotidianos"),
+            # Gestionables recurrentes consumidos (excluye PAGO UNICO)
+            func.coalesce(
+                func.sum(Gasto.importe_cuota).filter(and_(gasto_pagado_en_mes, _GASTO_GESTIONABLE, _GASTO_RECURRENTE)),
+                0.0,
+            ).label("gas_recurrentes"),
+            # Gestionables extras consumidos (PAGO UNICO / PAGO ÚNICO)
+            func.coalesce(
+                func.sum(Gasto.importe_cuota).filter(and_(gasto_pagado_en_mes, _GASTO_GESTIONABLE, _GASTO_EXTRA)),
+                0.0,
+            ).label("gas_extra_importe"),
+            func.count().filter(and_(gasto_pagado_en_mes, _GASTO_GESTIONABLE, _GASTO_EXTRA)).label("gas_extra_num"),
+        )
+        .where(Gasto.user_id == user_id)
+        .cte("gas")
+    )
+
+    # Cotidianos consumidos (pagado = true)
+    cot = (
+        select(func.coalesce(func.sum(GastoCotidiano.importe), 0.0).label("cot_consumidos"))
+        .where(
+            GastoCotidiano.user_id == user_id,
+            GastoCotidiano.pagado.is_(True),
+            GastoCotidiano.fecha >= ini,
+            GastoCotidiano.fecha < fin_excl,
+        )
+        .cte("cot")
+    )
+
+    # -------------------------------------------------------------------------
+    # CIERRES: media 12m y run rate salen de la MISMA ventana.
+    # Comparación por tupla (anio, mes): sargable sobre el índice
+    # (user_id, anio, mes) y sin aritmética por fila (ni riesgo de overflow SMALLINT).
+    # -------------------------------------------------------------------------
+    period = tuple_(CierreMensual.anio, CierreMensual.mes)
+    cie = (
+        select(
+            func.coalesce(func.avg(CierreMensual.ingresos_reales), 0.0).label("cie_ingresos_media"),
+            func.coalesce(func.avg(CierreMensual.gastos_reales_total), 0.0).label("cie_gastos_media"),
+            func.coalesce(func.avg(CierreMensual.resultado_real), 0.0).label("cie_resultado_media"),
+            func.count(CierreMensual.id).label("cie_meses"),
+        )
+        .where(
+            CierreMensual.user_id == user_id,
+            period >= tuple_(*start),
+            period <= tuple_(*end),
+        )
+        .cte("cie")
+    )
+
+    # ¿El mes objetivo ya está cerrado? (usa el mismo índice (user_id, anio, mes))
+    mes_cerrado = exists().where(
+        CierreMensual.user_id == user_id,
+        CierreMensual.anio == bindparam("anio"),
+        CierreMensual.mes == bindparam("mes"),
+    )
+
+    # -------------------------------------------------------------------------
+    # KPIs derivados sobre las cuatro filas
+    # -------------------------------------------------------------------------
+    ingresos_mes = ing.c.ing_recurrentes + ing.c.ing_extra_importe
+    # Gastos totales reales del mes (sin doble contar extras)
+    gastos_mes = gas.c.gas_recurrentes + gas.c.gas_extra_importe + cot.c.cot_consumidos
+
+    def pct_of(part, total):
+        return case((total > 0, part / total * 100.0))
+
+    return select(
+        ing,
+        gas,
+        cot,
+        cie,
+        ingresos_mes.label("ingresos_mes"),
+        gastos_mes.label("gastos_mes"),
+        (ingresos_mes - gastos_mes).label("ahorro_mes"),
+        pct_of(ingresos_mes - cie.c.cie_ingresos_media, cie.c.cie_ingresos_media).label("ingresos_vs_media_pct"),
+        pct_of(gastos_mes - cie.c.cie_gastos_media, cie.c.cie_gastos_media).label("gastos_vs_media_pct"),
+        pct_of(gastos_mes, ingresos_mes).label("ratio_gasto_pct"),
+        pct_of(ing.c.ing_recurrentes, ingresos_mes).label("pct_ing_recurrentes"),
+        pct_of(ing.c.ing_extra_importe, ingresos_mes).label("pct_ing_extra"),
+        pct_of(gas.c.gas_recurrentes, gastos_mes).label("pct_gas_recurrentes"),
+        pct_of(gas.c.gas_extra_importe, gastos_mes).label("pct_gas_extra"),
+        pct_of(cot.c.cot_consumidos, gastos_mes).label("pct_gas_cotidianos"),
+        mes_cerrado.label("mes_cerrado"),
+    ).select_from(
+        ing.join(gas, true()).join(cot, true()).join(cie, true())
+    )
+
+
+# Sentencia construida una sola vez; por petición sólo cambian los parámetros
+_MONTHLY_SUMMARY_STMT = _build_monthly_summary_stmt()
+
+
+@router.get(
+    "/analytics/monthly-summary",
+    response_model=MonthlySummaryResponse,
+    name="monthly_summary_get",
+)
+def get_monthly_summary(
+    request: Request,
+    year: Optional[int] = Query(None, description="Año (por defecto, año actual)"),
+    month: Optional[int] = Query(None, description="Mes 1-12 (por defecto, mes actual)"),
+    fields: Optional[str] = Query(
+        None,
+        description="Secciones opcionales a incluir (CSV): distribucion, notas. Por defecto, todas.",
+    ),
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(require_user_id),
+) -> Response:
+    """
+    Resumen mensual de ingresos y gastos (alineado con Home):
+
+    INGRESOS
+    - REAL recurrentes: activo+kpi+cobrados dentro del mes, periodicidad != PAGO UNICO
+    - REAL extras: cobrados dentro del mes, periodicidad = PAGO UNICO (sin filtrar activo/kpi)
+    - PRESUPUESTO ingresos: activo+kpi, periodicidad != PAGO UNICO (extras NO se presupuestan)
+
+    GASTOS
+    - PRESUPUESTO gestionables: activo+kpi, segmento != COT, periodicidad != PAGO UNICO (extras NO se presupuestan)
+    - PRESUPUESTO cotidianos: activo+kpi, segmento = COT
+    - REAL gestionables recurrentes: pagados en mes, segmento != COT, periodicidad != PAGO UNICO (SIN filtros activo/kpi)
+    - REAL gestionables extras: pagados en mes, segmento != COT, periodicidad = PAGO UNICO (incluye legacy PAGO ÚNICO)
+    - REAL cotidianos: gasto_cotidiano pagado en mes
+    - REAL gastos_mes: gestionables_recurrentes + gestionables_extras + cotidianos
+
+    NOTA SOBRE "vs media 12m" y "run rate 12m":
+    - Ambos se calculan contra los 12 cierres ANTERIORES al mes objetivo.
+    - Esto evita "contaminar" la media incluyendo el propio mes objetivo.
+
+    CACHÉ:
+    - La respuesta se cachea por (usuario, anio, mes); ver MSUM_TTL_*.
+    - Se invalida al hacer commit de cambios en ingresos, gastos,
+      gastos cotidianos o cierres del usuario.
+    - ETag del contenido + If-None-Match -> 304 sin cuerpo (ver _json_response).
+
+    FIELDS:
+    - `fields=distribucion,notas` limita las secciones opcionales que se
+      construyen; las no pedidas se devuelven como lista vacía.
+    """
+    today = date.today()
+    anio = year or today.year
+    mes = month or today.month
+    ini, fin_excl, mes_label = _month_meta(anio, mes)
+
+    con_distribucion, con_notas = _parse_fields(fields)
+
+    cache_k = cache_key(_msum_cache_ns(current_user_id), anio, mes, int(con_distribucion), int(con_notas))
+    cached = cache_get(cache_k)
+    if cached is not None:
+        return _json_response(request, cached)
+
+    # -------------------------------------------------------------------------
+    # ✅ Ventana 12 meses (benchmark) CORRECTA Y SIN OVERFLOW
+    #
+    # Queremos los 12 cierres anteriores al mes objetivo:
+    #   end = mes objetivo - 1
+    #   start = end - 11
+    #
+    # Ej (mes objetivo = 2025-12):
+    #   end = 2025-11
+    #   start = 2024-12
+    #   => 12 meses: 202412..202511
+    # -------------------------------------------------------------------------
+    end_y, end_m = _add_months(anio, mes, -1)
+    start_y, start_m = _add_months(end_y, end_m, -11)
+
+    # Una única sentencia con todos los subtotales y KPIs (ver _build_monthly_summary_stmt)
+    row = db.execute(
+        _MONTHLY_SUMMARY_STMT,
+        {
+            "user_id": current_user_id,
+            "ini": ini,
+            "fin_excl": fin_excl,
+            "anio": anio,
+            "mes": mes,
+            "start_y": start_y,
+            "start_m": start_m,
+            "end_y": end_y,
+            "end_m": end_m,
+        },
+    ).one()
+
+    # -------------------------------------------------------------------------
+    # 1) INGRESOS (REAL + PRESUPUESTO)
+    # -------------------------------------------------------------------------
+
+    ingresos_recurrentes_mes = float(row.ing_recurrentes or 0.0)
+    presupuesto_ingresos = float(row.ing_presupuesto or 0.0)
+    ingresos_extra_importe = float(row.ing_extra_importe or 0.0)
+    ingresos_extra_num = int(row.ing_extra_num or 0)
+
+    ingresos_mes = float(row.ingresos_mes or 0.0)
+
+    # -------------------------------------------------------------------------
+    # 2) PRESUPUESTOS DE GASTO (NO incluyen extras)
+    # -------------------------------------------------------------------------
+
+    presupuesto_gestionables = float(row.gas_presupuesto_gestionables or 0.0)
+    presupuesto_cotidianos = float(row.gas_presupuesto_cotidianos or 0.0)
+
+    gasto_total_presupuesto = presupuesto_gestionables + presupuesto_cotidianos
+
+    # -------------------------------------------------------------------------
+    # 3) GASTOS REALES (consumidos)
+    # -------------------------------------------------------------------------
+
+    consumidos_gestionables_recurrentes = float(row.gas_recurrentes or 0.0)
+    gastos_extra_importe = float(row.gas_extra_importe or 0.0)
+    gastos_extra_num = int(row.gas_extra_num or 0)
+    consumidos_cotidianos = float(row.cot_consumidos or 0.0)
+
+    gastos_mes = float(row.gastos_mes or 0.0)
+
+    # -------------------------------------------------------------------------
+    # 4) KPIs generales
+    # -------------------------------------------------------------------------
+
+    ahorro_mes = float(row.ahorro_mes or 0.0)
+
+    # vs media 12m: None si no hay media (calculado en SQL)
+    ingresos_vs_media_pct = row.ingresos_vs_media_pct
+    gastos_vs_media_pct = row.gastos_vs_media_pct
+
+    # -------------------------------------------------------------------------
+    # 5-6) Distribuciones (porcentajes ya calculados en SQL)
+    # -------------------------------------------------------------------------
+
+    distribucion_ingresos = _distribucion(
+        ingresos_mes if con_distribucion else 0.0,
+        (
+            ("Recurrentes", ingresos_recurrentes_mes, row.pct_ing_recurrentes),
+            ("Extraordinarios", ingresos_extra_importe, row.pct_ing_extra),
+        ),
+    )
+
+    distribucion_gastos = _distribucion(
+        gastos_mes if con_distribucion else 0.0,
+        (
+            ("Gestionables", consumidos_gestionables_recurrentes, row.pct_gas_recurrentes),
+            ("Extraordinarios", gastos_extra_importe, row.pct_gas_extra),
+            ("Cotidianos", consumidos_cotidianos, row.pct_gas_cotidianos),
+        ),
+    )
+
+    # -------------------------------------------------------------------------
+    # 7) Run rate 12 meses
+    # -------------------------------------------------------------------------
+
+    # Run rate: promedio de los 12 cierres ANTERIORES (no incluye el mes objetivo)
+    ingreso_medio_12m = float(row.cie_ingresos_media or 0.0)
+    gasto_medio_12m = float(row.cie_gastos_media or 0.0)
+    ahorro_medio_12m = float(row.cie_resultado_media or 0.0)
+    meses_usados = int(row.cie_meses or 0)
+
+
+    # -------------------------------------------------------------------------
+    # 8) Alertas e Insight (ANTES: notas)
+    # -------------------------------------------------------------------------
+    #
+    # Objetivo:
+    # - Dar señales accionables sin generar "spam".
+    # - Mantener compatibilidad: se devuelve la lista `notas` como antes.
+    #
+    # Convención de tipo:
+    # - WARNING: requiere atención
+    # - SUCCESS: señal positiva
+    # - INFO: insight informativo
+    # -------------------------------------------------------------------------
+
+    notas = (
+        _build_notas(
+            row,
+            ingresos_mes=ingresos_mes,
+            gastos_mes=gastos_mes,
+            ahorro_mes=ahorro_mes,
+            ingresos_vs_media_pct=ingresos_vs_media_pct,
+            gastos_vs_media_pct=gastos_vs_media_pct,
+            ingresos_extra_importe=ingresos_extra_importe,
+            gastos_extra_importe=gastos_extra_importe,
+            gasto_total_presupuesto=gasto_total_presupuesto,
+            presupuesto_cotidianos=presupuesto_cotidianos,
+            consumidos_cotidianos=consumidos_cotidianos,
+        )
+        if con_notas
+        else []
+    )
+
     # -------------------------------------------------------------------------
     # 9) Response (IMPORTANTE: consumidos_cotidianos es REQUIRED en tu schema)
+    #
+    # Todos los modelos se construyen aquí, una sola vez, a partir de los
+    # locales. Son datos propios ya tipados (float/int de la consulta), así
+    # que usamos model_construct() y nos ahorramos la validación.
     # -------------------------------------------------------------------------
 
-    response = MonthlySummaryResponse(
+    response = MonthlySummaryResponse.model_construct(
         anio=anio,
         mes=mes,
         mes_label=mes_label,
-        general=general,
-        detalle_ingresos=detalle_ingresos,
-        detalle_gastos=detalle_gastos,
+        general=MonthlyGeneralKpi.model_construct(
+            ingresos_mes=ingresos_mes,
+            gastos_mes=gastos_mes,
+            ahorro_mes=ahorro_mes,
+            ingresos_vs_media_12m_pct=ingresos_vs_media_pct,
+            gastos_vs_media_12m_pct=gastos_vs_media_pct,
+        ),
+        detalle_ingresos=MonthlyIngresosDetalle.model_construct(
+            recurrentes=ingresos_recurrentes_mes,
+            extraordinarios=ingresos_extra_importe,
+            num_extra=ingresos_extra_num,
+        ),
+        detalle_gastos=MonthlyGastosDetalle.model_construct(
+            recurrentes=consumidos_gestionables_recurrentes,
+            extraordinarios=gastos_extra_importe,
+            num_extra=gastos_extra_num,
+        ),
         distribucion_ingresos=distribucion_ingresos,
         distribucion_gastos=distribucion_gastos,
-        presupuestos=presupuestos,
+        presupuestos=MonthlyPresupuestos.model_construct(
+            ingresos_presupuesto=presupuesto_ingresos,
+            gestionables_presupuesto=presupuesto_gestionables,
+            cotidianos_presupuesto=presupuesto_cotidianos,
+            gasto_total_presupuesto=gasto_total_presupuesto,
+        ),
         consumidos_cotidianos=consumidos_cotidianos,  # ✅ requerido
-        run_rate_12m=run_rate_12m,
+        run_rate_12m=(
+            MonthlyRunRate.model_construct(
+                ingreso_medio_12m=ingreso_medio_12m,
+                gasto_medio_12m=gasto_medio_12m,
+                ahorro_medio_12m=ahorro_medio_12m,
+                proyeccion_ahorro_anual=ahorro_medio_12m * 12.0,
+                meses_usados=meses_usados,
+            )
+            if meses_usados > 0
+            else None
+        ),
         notas=notas,
     )
 
-    return response
+    if not is_shared():
+        ttl = MSUM_TTL_CURRENT
+    elif row.mes_cerrado:
+        ttl = MSUM_TTL_CLOSED
+    elif (anio, mes) < (today.year, today.month):
+        ttl = MSUM_TTL_PAST
+    else:
+        ttl = MSUM_TTL_CURRENT
+    # Serializamos una vez (pydantic-core) y devolvemos esos mismos bytes:
+    # FastAPI no vuelve a validar/serializar un Response.
+    body = _RESPONSE_ADAPTER.dump_json(response)
+    cache_set(cache_k, body, ttl=ttl)
+
+    return _json_response(request, body)
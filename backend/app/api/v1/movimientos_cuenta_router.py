@@ -1,33 +1,134 @@
 # app/api/v1/movimientos_cuenta_router.py
 
+import logging
 import secrets
 from datetime import date
-from decimal import Decimal
-from typing import List, Optional
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import and_, desc, or_
+from sqlalchemy import and_, case, delete, desc, func, insert, select, union_all, update
 
 from backend.app.db.session import get_db
-from backend.app.db.models import MovimientoCuenta, CuentaBancaria, User
+from backend.app.db.models import MovimientoCuenta, CuentaBancaria
 from backend.app.schemas.movimiento_cuenta import (
     MovimientoCuentaCreate,
     MovimientoCuentaRead,
     MovimientoCuentaListItem,
     AjusteLiquidezPayload,
 )
-from backend.app.api.v1.auth_router import require_user
+from backend.app.api.v1.auth_router import require_user_id
+from backend.app.utils.cache import cache_get, cache_key, cache_set, invalidate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/movimientos-cuenta",
     tags=["movimientos_cuenta"],
 )
 
+# Listado: las filas ya traen las claves de MovimientoCuentaListItem; se
+# serializan directamente (Decimal -> string, igual que con response_model).
+# El schema para OpenAPI se declara vía `responses`.
+_LIST_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+# Caché del listado (bytes JSON) por usuario y filtros. Se invalida en cada
+# escritura de movimientos o de cuentas (el listado incluye los anagramas).
+MOV_LIST_TTL = 60
+
+
+def _mov_cache_ns(user_id: int) -> str:
+    return f"mov:{user_id}"
+
+
+def invalidate_movimientos_cache(user_id: int) -> None:
+    """
+    Invalida los listados de movimientos cacheados del usuario.
+    Llamar DESPUÉS del commit.
+    """
+    invalidate(_mov_cache_ns(user_id))
+
+
+# Columnas Numeric(12,2) del movimiento
+_CENTIMO = Decimal("0.01")
+_CAMPOS_IMPORTE = (
+    "importe",
+    "saldo_origen_antes",
+    "saldo_origen_despues",
+    "saldo_destino_antes",
+    "saldo_destino_despues",
+)
+
 
 def generar_id_movimiento() -> str:
-    token = secrets.token_hex(4).upper()
-    return f"MOV-{token}"
+    return f"MOV-{secrets.token_bytes(4).hex().upper()}"
+
+
+def _aplicar_importe(
+    db: Session,
+    cuenta_resta_id: str,
+    cuenta_suma_id: str,
+    importe: Decimal,
+) -> Dict[str, Tuple[Decimal, Optional[str]]]:
+    """
+    Resta `importe` de una cuenta y lo suma a otra con un único
+    UPDATE ... RETURNING: atómico en la BD y sin SELECT previo.
+
+    Devuelve {cuenta_id: (liquidez_despues, anagrama)} sólo con las cuentas
+    que existen; si falta alguna, el llamador debe hacer rollback.
+
+    Si ambas son la misma cuenta (movimientos de ajuste), se aplica la resta
+    (mismo resultado que tenía la versión ORM al revertir un ajuste).
+    """
+    importe_f = float(importe)  # liquidez es Float en la BD
+    rows = db.execute(
+        update(CuentaBancaria)
+        .where(CuentaBancaria.id.in_([cuenta_resta_id, cuenta_suma_id]))
+        .values(
+            liquidez=func.coalesce(CuentaBancaria.liquidez, 0)
+            + case((CuentaBancaria.id == cuenta_resta_id, -importe_f), else_=importe_f)
+        )
+        .returning(CuentaBancaria.id, CuentaBancaria.liquidez, CuentaBancaria.anagrama)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return {r.id: (Decimal(str(r.liquidez)), r.anagrama) for r in rows}
+
+
+def _importe_bd(valor: Optional[Decimal]) -> Optional[Decimal]:
+    """Redondeo que aplica la BD al guardar en Numeric(12,2)."""
+    return None if valor is None else valor.quantize(_CENTIMO, rounding=ROUND_HALF_UP)
+
+
+def _insertar_movimiento(
+    db: Session,
+    valores: Dict[str, Any],
+    origen_nombre: Optional[str],
+    destino_nombre: Optional[str],
+) -> MovimientoCuentaRead:
+    """
+    Inserta el movimiento con INSERT ... RETURNING createdon (sin objeto ORM,
+    flush ni refresh posterior) y construye la respuesta desde `valores`.
+
+    Los importes se devuelven redondeados como los guarda Numeric(12,2),
+    igual que si se releyera la fila.
+    """
+    createdon = db.execute(
+        insert(MovimientoCuenta).values(**valores).returning(MovimientoCuenta.createdon)
+    ).scalar_one()
+
+    datos = dict(valores)
+    for campo in _CAMPOS_IMPORTE:
+        datos[campo] = _importe_bd(datos[campo])
+
+    return MovimientoCuentaRead.model_construct(
+        **datos,
+        createdon=createdon,
+        cuenta_origen_nombre=origen_nombre,
+        cuenta_destino_nombre=destino_nombre,
+    )
+
 
 @router.post(
     "",
@@ -38,7 +139,7 @@ def generar_id_movimiento() -> str:
 def crear_movimiento_cuenta(
     payload: MovimientoCuentaCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    user_id: int = Depends(require_user_id),
 ):
     """
     Crea un movimiento entre cuentas:
@@ -53,122 +154,107 @@ def crear_movimiento_cuenta(
             detail="La cuenta de origen y la de destino no pueden ser la misma.",
         )
 
-    # Buscar cuentas
-    cuenta_origen: Optional[CuentaBancaria] = (
-        db.query(CuentaBancaria)
-        .filter(CuentaBancaria.id == payload.cuenta_origen_id)
-        .first()
-    )
-    cuenta_destino: Optional[CuentaBancaria] = (
-        db.query(CuentaBancaria)
-        .filter(CuentaBancaria.id == payload.cuenta_destino_id)
-        .first()
-    )
-
-    if not cuenta_origen:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cuenta de origen no encontrada.",
-        )
-
-    if not cuenta_destino:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cuenta de destino no encontrada.",
-        )
-
-    # Importe positivo obligatorio
-    if payload.importe is None or payload.importe <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El importe debe ser mayor que cero.",
-        )
-
-    # Normalizar importe a Decimal (por si llega como float)
-    importe_dec = (
-        payload.importe
-        if isinstance(payload.importe, Decimal)
-        else Decimal(str(payload.importe))
-    )
+    # El schema ya lo valida como Decimal > 0
+    importe_dec = payload.importe
 
     try:
-        # Asegurarnos de que liquidez también es Decimal
-        liquidez_origen = (
-            cuenta_origen.liquidez
-            if isinstance(cuenta_origen.liquidez, Decimal)
-            else Decimal(str(cuenta_origen.liquidez or 0))
-        )
-        liquidez_destino = (
-            cuenta_destino.liquidez
-            if isinstance(cuenta_destino.liquidez, Decimal)
-            else Decimal(str(cuenta_destino.liquidez or 0))
+        # Aplicamos el movimiento en UNA sentencia atómica (sin leer antes):
+        # liquidez = liquidez -/+ importe en la BD, así dos movimientos
+        # concurrentes sobre la misma cuenta no se pisan.
+        saldos = _aplicar_importe(
+            db,
+            payload.cuenta_origen_id,
+            payload.cuenta_destino_id,
+            importe_dec,
         )
 
-        # 👉 Guardamos saldos "antes"
-        saldo_origen_antes = liquidez_origen
-        saldo_destino_antes = liquidez_destino
+        if payload.cuenta_origen_id not in saldos:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cuenta de origen no encontrada.",
+            )
 
-        # Aplicamos el movimiento
-        cuenta_origen.liquidez = liquidez_origen - importe_dec
-        cuenta_destino.liquidez = liquidez_destino + importe_dec
+        if payload.cuenta_destino_id not in saldos:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cuenta de destino no encontrada.",
+            )
 
-        # 👉 Guardamos saldos "después"
-        saldo_origen_despues = cuenta_origen.liquidez
-        saldo_destino_despues = cuenta_destino.liquidez
+        # 👉 Saldos "después" (RETURNING) y "antes" (deshaciendo el importe)
+        saldo_origen_despues, origen_nombre = saldos[payload.cuenta_origen_id]
+        saldo_destino_despues, destino_nombre = saldos[payload.cuenta_destino_id]
+        saldo_origen_antes = saldo_origen_despues + importe_dec
+        saldo_destino_antes = saldo_destino_despues - importe_dec
 
         # Crear registro de movimiento
-        mov = MovimientoCuenta(
-            id=generar_id_movimiento(),
-            fecha=payload.fecha,
-            cuenta_origen_id=payload.cuenta_origen_id,
-            cuenta_destino_id=payload.cuenta_destino_id,
-            importe=importe_dec,
-            comentarios=payload.comentarios,
-            user_id=current_user.id if current_user else None,
-            saldo_origen_antes=saldo_origen_antes,
-            saldo_origen_despues=saldo_origen_despues,
-            saldo_destino_antes=saldo_destino_antes,
-            saldo_destino_despues=saldo_destino_despues,
+        mov = _insertar_movimiento(
+            db,
+            dict(
+                id=generar_id_movimiento(),
+                fecha=payload.fecha,
+                cuenta_origen_id=payload.cuenta_origen_id,
+                cuenta_destino_id=payload.cuenta_destino_id,
+                importe=importe_dec,
+                comentarios=payload.comentarios,
+                user_id=user_id,
+                saldo_origen_antes=saldo_origen_antes,
+                saldo_origen_despues=saldo_origen_despues,
+                saldo_destino_antes=saldo_destino_antes,
+                saldo_destino_despues=saldo_destino_despues,
+            ),
+            origen_nombre,
+            destino_nombre,
         )
 
-        db.add(mov)
         db.commit()
-        db.refresh(mov)
-
-        # Campos derivados para el response_model
-        mov.cuenta_origen_nombre = cuenta_origen.anagrama  # type: ignore[attr-defined]
-        mov.cuenta_destino_nombre = cuenta_destino.anagrama  # type: ignore[attr-defined]
+        invalidate_movimientos_cache(user_id)
 
         return mov
 
+    except HTTPException:
+        raise
 
-    except Exception as exc:
+    except Exception:
         db.rollback()
-        import traceback, sys
-
-        print("\n\n===== ERROR crear_movimiento_cuenta =====", file=sys.stderr)
-        print(repr(exc), file=sys.stderr)
-        traceback.print_exc()
-        print("===== FIN ERROR crear_movimiento_cuenta =====\n\n", file=sys.stderr)
+        logger.exception(
+            "[movimientos_cuenta] crear FAILED origen=%s destino=%s",
+            payload.cuenta_origen_id,
+            payload.cuenta_destino_id,
+        )
 
         # De momento dejamos que FastAPI genere el 500 con el traceback "normal"
         raise
 
+def _rango_mes(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+) -> Optional[Tuple[date, date]]:
+    """
+    Dependencia: (inicio, fin_exclusivo) del mes pedido, o None si no vienen
+    year y month. month // 12 resuelve el salto de diciembre a enero.
+    """
+    if year is None or month is None:
+        return None
+    return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+
+
 # ---------------------------------------------------------
 # GET /api/v1/movimientos-cuenta
 # Listar últimos movimientos (para BalanceScreen)
 # ---------------------------------------------------------
 @router.get(
     "",
-    response_model=List[MovimientoCuentaListItem],
+    response_model=None,
+    responses={200: {"model": List[MovimientoCuentaListItem]}},
 )
 def listar_movimientos_cuenta(
     limit: int = Query(50, ge=1, le=500),          # 👈 subimos el máximo a 500
-    year: Optional[int] = Query(None, ge=2000, le=2100),
-    month: Optional[int] = Query(None, ge=1, le=12),
+    rango: Optional[Tuple[date, date]] = Depends(_rango_mes),
     cuenta_id: Optional[str] = Query(None),        # 👈 opcional: permitir filtrar por cuenta
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    user_id: int = Depends(require_user_id),
 ):
     """
     Listar movimientos de cuenta (compacto) para el usuario autenticado.
@@ -177,80 +263,92 @@ def listar_movimientos_cuenta(
     - Opcionalmente filtra por año/mes.
     - Opcionalmente filtra por cuenta (origen o destino).
     - Devuelve un máximo de `limit` registros, ordenados del más reciente al más antiguo.
+    - Respuesta cacheada MOV_LIST_TTL segundos (se invalida al escribir).
     """
 
+    key = cache_key(_mov_cache_ns(user_id), limit, rango[0] if rango else None, cuenta_id)
+    body = cache_get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
     Origen = aliased(CuentaBancaria, name="origen")
     Destino = aliased(CuentaBancaria, name="destino")
 
-    filtros = [MovimientoCuenta.user_id == current_user.id]
-
-    if year is not None and month is not None:
-        if month == 12:
-            start_date = date(year, 12, 1)
-            end_date = date(year + 1, 1, 1)
-        else:
-            start_date = date(year, month, 1)
-            end_date = date(year, month + 1, 1)
+    filtros = [MovimientoCuenta.user_id == user_id]
 
+    if rango is not None:
         filtros.append(
             and_(
-                MovimientoCuenta.fecha >= start_date,
-                MovimientoCuenta.fecha < end_date,
+                MovimientoCuenta.fecha >= rango[0],
+                MovimientoCuenta.fecha < rango[1],
             )
         )
 
-    # 👇 si viene cuenta_id, filtramos por origen o destino
-    if cuenta_id is not None:
-        filtros.append(
-            or_(
-                MovimientoCuenta.cuenta_origen_id == cuenta_id,
-                MovimientoCuenta.cuenta_destino_id == cuenta_id,
+    def ultimos(*condiciones):
+        # Últimos `limit` movimientos (sólo la tabla de movimientos): con el
+        # índice (user_id, fecha DESC, id DESC) es un range scan con LIMIT
+        return (
+            select(
+                MovimientoCuenta.id,
+                MovimientoCuenta.fecha,
+                MovimientoCuenta.importe,
+                MovimientoCuenta.comentarios,
+                MovimientoCuenta.cuenta_origen_id,
+                MovimientoCuenta.cuenta_destino_id,
+                MovimientoCuenta.saldo_origen_antes,
+                MovimientoCuenta.saldo_origen_despues,
+                MovimientoCuenta.saldo_destino_antes,
+                MovimientoCuenta.saldo_destino_despues,
             )
+            .where(*filtros, *condiciones)
+            .order_by(desc(MovimientoCuenta.fecha), desc(MovimientoCuenta.id))
+            .limit(limit)
         )
 
-    query = (
-        db.query(
-            MovimientoCuenta.id,
-            MovimientoCuenta.fecha,
-            MovimientoCuenta.importe,
-            MovimientoCuenta.comentarios,
-            MovimientoCuenta.cuenta_origen_id,
-            MovimientoCuenta.cuenta_destino_id,
-            MovimientoCuenta.saldo_origen_antes,
-            MovimientoCuenta.saldo_origen_despues,
-            MovimientoCuenta.saldo_destino_antes,
-            MovimientoCuenta.saldo_destino_despues,
+    # 👇 si viene cuenta_id, filtramos por origen o destino: UNION ALL de dos
+    # ramas (cada una con su índice) en vez de un OR que suele acabar en
+    # seq scan / BitmapOr + sort. La 2ª rama excluye origen = cuenta para no
+    # duplicar los ajustes (origen = destino).
+    if cuenta_id is not None:
+        movs = union_all(
+            select(ultimos(MovimientoCuenta.cuenta_origen_id == cuenta_id).subquery()),
+            select(
+                ultimos(
+                    MovimientoCuenta.cuenta_destino_id == cuenta_id,
+                    MovimientoCuenta.cuenta_origen_id != cuenta_id,
+                ).subquery()
+            ),
+        ).subquery("m")
+    else:
+        movs = ultimos().subquery("m")
+
+    # Core select -> dicts con exactamente las claves de MovimientoCuentaListItem,
+    # serializados a JSON en una sola llamada (sin modelos por fila).
+    # Los anagramas se resuelven sólo para las (<= limit) filas elegidas.
+    stmt = (
+        select(
+            movs.c.id,
+            movs.c.fecha,
+            movs.c.importe,
             Origen.anagrama.label("origen_nombre"),
             Destino.anagrama.label("destino_nombre"),
+            movs.c.comentarios,
+            movs.c.saldo_origen_antes,
+            movs.c.saldo_origen_despues,
+            movs.c.saldo_destino_antes,
+            movs.c.saldo_destino_despues,
         )
-        .join(Origen, MovimientoCuenta.cuenta_origen_id == Origen.id)
-        .join(Destino, MovimientoCuenta.cuenta_destino_id == Destino.id)
-        .filter(*filtros)
-        .order_by(desc(MovimientoCuenta.fecha), desc(MovimientoCuenta.id))
+        .join(Origen, movs.c.cuenta_origen_id == Origen.id)
+        .join(Destino, movs.c.cuenta_destino_id == Destino.id)
+        .order_by(desc(movs.c.fecha), desc(movs.c.id))
         .limit(limit)
     )
 
+    rows = db.execute(stmt).mappings().all()
+    body = _LIST_ADAPTER.dump_json([dict(r) for r in rows])
+    cache_set(key, body, ttl=MOV_LIST_TTL)
 
-    rows = query.all()
-
-    resultados: List[MovimientoCuentaListItem] = []
-    for row in rows:
-        resultados.append(
-            MovimientoCuentaListItem(
-                id=row.id,
-                fecha=row.fecha,
-                importe=row.importe,
-                origen_nombre=row.origen_nombre,
-                destino_nombre=row.destino_nombre,
-                comentarios=row.comentarios,
-                saldo_origen_antes=row.saldo_origen_antes,
-                saldo_origen_despues=row.saldo_origen_despues,
-                saldo_destino_antes=row.saldo_destino_antes,
-                saldo_destino_despues=row.saldo_destino_despues,
-            )
-        )
-
-    return resultados
+    return Response(content=body, media_type="application/json")
 
 
 # ---------------------------------------------------------
@@ -265,7 +363,7 @@ def listar_movimientos_cuenta(
 def eliminar_movimiento_cuenta(
     movimiento_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    user_id: int = Depends(require_user_id),
 ):
     """
     Elimina un movimiento de cuentas y revierte su efecto en la liquidez:
@@ -274,80 +372,58 @@ def eliminar_movimiento_cuenta(
     - Resta el importe a la cuenta de destino.
     """
 
-    # 1) Buscar el movimiento del usuario
-    mov: Optional[MovimientoCuenta] = (
-        db.query(MovimientoCuenta)
-        .filter(
-            MovimientoCuenta.id == movimiento_id,
-            MovimientoCuenta.user_id == current_user.id,
-        )
-        .first()
-    )
-
-    if not mov:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Movimiento no encontrado.",
-        )
-
-    # 2) Buscar cuentas origen y destino
-    cuenta_origen: Optional[CuentaBancaria] = (
-        db.query(CuentaBancaria)
-        .filter(CuentaBancaria.id == mov.cuenta_origen_id)
-        .first()
-    )
-    cuenta_destino: Optional[CuentaBancaria] = (
-        db.query(CuentaBancaria)
-        .filter(CuentaBancaria.id == mov.cuenta_destino_id)
-        .first()
-    )
-
-    if not cuenta_origen or not cuenta_destino:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="No se pudieron recuperar las cuentas asociadas al movimiento.",
-        )
-
-    # 3) Normalizar importe a Decimal
-    importe_dec = (
-        mov.importe
-        if isinstance(mov.importe, Decimal)
-        else Decimal(str(mov.importe))
-    )
-
     try:
-        # 4) Normalizar liquidez
-        liquidez_origen = (
-            cuenta_origen.liquidez
-            if isinstance(cuenta_origen.liquidez, Decimal)
-            else Decimal(str(cuenta_origen.liquidez or 0))
-        )
-        liquidez_destino = (
-            cuenta_destino.liquidez
-            if isinstance(cuenta_destino.liquidez, Decimal)
-            else Decimal(str(cuenta_destino.liquidez or 0))
-        )
+        # 1) Borrar el movimiento del usuario y recuperar lo necesario para
+        #    revertirlo en la misma sentencia (DELETE ... RETURNING)
+        mov = db.execute(
+            delete(MovimientoCuenta)
+            .where(
+                MovimientoCuenta.id == movimiento_id,
+                MovimientoCuenta.user_id == user_id,
+            )
+            .returning(
+                MovimientoCuenta.cuenta_origen_id,
+                MovimientoCuenta.cuenta_destino_id,
+                MovimientoCuenta.importe,
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
+
+        if not mov:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Movimiento no encontrado.",
+            )
 
-        # 5) Revertir el efecto del movimiento:
+        # 2) Revertir el efecto del movimiento en UNA sentencia atómica:
         #    Alta = origen - importe, destino + importe
         #    Baja = origen + importe, destino - importe
-        cuenta_origen.liquidez = liquidez_origen + importe_dec
-        cuenta_destino.liquidez = liquidez_destino - importe_dec
+        saldos = _aplicar_importe(
+            db,
+            mov.cuenta_destino_id,
+            mov.cuenta_origen_id,
+            mov.importe,  # Numeric -> ya es Decimal
+        )
+
+        if mov.cuenta_origen_id not in saldos or mov.cuenta_destino_id not in saldos:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="No se pudieron recuperar las cuentas asociadas al movimiento.",
+            )
 
-        # 6) Borrar el movimiento
-        db.delete(mov)
         db.commit()
+        invalidate_movimientos_cache(user_id)
 
         return
 
-    except Exception as exc:
-        db.rollback()
-        import traceback, sys
+    except HTTPException:
+        raise
 
-        print("\n\n===== ERROR eliminar_movimiento_cuenta =====", file=sys.stderr)
-        print(repr(exc), file=sys.stderr)
-        traceback.print_exc()
-        print("===== FIN ERROR eliminar_movimiento_cuenta =====\n\n", file=sys.stderr)
+    except Exception:
+        db.rollback()
+        logger.exception("[movimientos_cuenta] eliminar FAILED movimiento_id=%s", movimiento_id)
         raise
 
 # ---------------------------------------------------------
@@ -362,7 +438,7 @@ def eliminar_movimiento_cuenta(
 def ajustar_liquidez_cuenta(
     payload: AjusteLiquidezPayload,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_user),
+    user_id: int = Depends(require_user_id),
 ):
     """
     Ajusta la liquidez de una cuenta bancaria a un nuevo saldo:
@@ -375,13 +451,15 @@ def ajustar_liquidez_cuenta(
         * saldo_origen_antes / despues = saldos antes/despues del ajuste
     """
 
-    # 1) Recuperar cuenta del usuario
+    # 1) Recuperar cuenta del usuario (bloqueada hasta el commit: el nuevo
+    #    saldo se calcula sobre la liquidez leída y nadie debe cambiarla entre medias)
     cuenta: Optional[CuentaBancaria] = (
         db.query(CuentaBancaria)
         .filter(
             CuentaBancaria.id == payload.cuenta_id,
-            CuentaBancaria.user_id == current_user.id,
+            CuentaBancaria.user_id == user_id,
         )
+        .with_for_update()
         .first()
     )
 
@@ -391,23 +469,10 @@ def ajustar_liquidez_cuenta(
             detail="Cuenta no encontrada o no pertenece al usuario.",
         )
 
-    # Normalizamos a Decimal
-    liquidez_actual = (
-        cuenta.liquidez
-        if isinstance(cuenta.liquidez, Decimal)
-        else Decimal(str(cuenta.liquidez or 0))
-    )
-    nuevo_saldo_dec = (
-        payload.nuevo_saldo
-        if isinstance(payload.nuevo_saldo, Decimal)
-        else Decimal(str(payload.nuevo_saldo))
-    )
-
-    if nuevo_saldo_dec < 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El nuevo saldo no puede ser negativo.",
-        )
+    # liquidez es Float en la BD: la pasamos a Decimal (vía str, sin ruido
+    # binario). nuevo_saldo ya llega como Decimal >= 0 desde el schema.
+    liquidez_actual = Decimal(str(cuenta.liquidez or 0))
+    nuevo_saldo_dec = payload.nuevo_saldo
 
     # 2) Si no hay cambio, no tiene sentido registrar nada
     delta = nuevo_saldo_dec - liquidez_actual
@@ -425,39 +490,33 @@ def ajustar_liquidez_cuenta(
     # 4) Movimiento de traza: importe SIEMPRE positivo (magnitud del ajuste)
     importe_mov = abs(delta)
 
-    mov = MovimientoCuenta(
-        id=generar_id_movimiento(),
-        fecha=payload.fecha,
-        cuenta_origen_id=payload.cuenta_id,
-        cuenta_destino_id=payload.cuenta_id,
-        importe=importe_mov,  # 👈 SIEMPRE > 0 para respetar el CHECK de la BD
-        comentarios=payload.comentarios
-        or "Ajuste manual de liquidez desde BalanceScreen",
-        user_id=current_user.id if current_user else None,
-        saldo_origen_antes=saldo_antes,
-        saldo_origen_despues=saldo_despues,
-        saldo_destino_antes=saldo_antes,
-        saldo_destino_despues=saldo_despues,
-    )
-
-    db.add(mov)
-
     try:
-        db.commit()
-        db.refresh(mov)
+        mov = _insertar_movimiento(
+            db,
+            dict(
+                id=generar_id_movimiento(),
+                fecha=payload.fecha,
+                cuenta_origen_id=payload.cuenta_id,
+                cuenta_destino_id=payload.cuenta_id,
+                importe=importe_mov,  # 👈 SIEMPRE > 0 para respetar el CHECK de la BD
+                comentarios=payload.comentarios
+                or "Ajuste manual de liquidez desde BalanceScreen",
+                user_id=user_id,
+                saldo_origen_antes=saldo_antes,
+                saldo_origen_despues=saldo_despues,
+                saldo_destino_antes=saldo_antes,
+                saldo_destino_despues=saldo_despues,
+            ),
+            cuenta.anagrama,
+            cuenta.anagrama,
+        )
 
-        # Campos derivados (igual que en crear_movimiento_cuenta)
-        mov.cuenta_origen_nombre = cuenta.anagrama  # type: ignore[attr-defined]
-        mov.cuenta_destino_nombre = cuenta.anagrama  # type: ignore[attr-defined]
+        db.commit()
+        invalidate_movimientos_cache(user_id)
 
         return mov
 
-    except Exception as exc:
+    except Exception:
         db.rollback()
-        import traceback, sys
-
-        print("\n\n===== ERROR ajustar_liquidez_cuenta =====", file=sys.stderr)
-        print(repr(exc), file=sys.stderr)
-        traceback.print_exc()
-        print("===== FIN ERROR ajustar_liquidez_cuenta =====\n\n", file=sys.stderr)
+        logger.exception("[movimientos_cuenta] ajustar FAILED cuenta_id=%s", payload.cuenta_id)
         raise
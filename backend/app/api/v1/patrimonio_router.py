@@ -20,7 +20,8 @@ Basado en backend/routers/patrimonio.py de la v2, manteniendo:
       en MAYÚSCULAS y sin tildes.
     * direccion_completa se compone en backend.
     * Campo disponible y campos de compra se tratan con getattr/hasattr
-      por compatibilidad con distintas versiones de la BD.
+      por compatibilidad con distintas versiones de la BD (la existencia
+      de 'disponible' se comprueba una vez al importar: _HAS_DISPONIBLE).
 
 Además, en v3:
 
@@ -30,11 +31,14 @@ Además, en v3:
 
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, raiseload
 
+from backend.app.core.config import settings
 from backend.app.db.session import get_db
 from backend.app.db import models
 from backend.app.schemas.patrimonio import (
@@ -44,16 +48,47 @@ from backend.app.schemas.patrimonio import (
     PatrimonioPickerOut,
     PatrimonioCompraIn,
     PatrimonioCompraOut,
+    PatrimonioConCompraSchema,
 )
 from backend.app.utils.text_utils import normalize_upper_ascii
 from backend.app.utils.id_utils import generate_patrimonio_id
 from backend.app.api.v1.auth_router import require_user
+from backend.app.utils.cache import cache_get, cache_key, cache_set, invalidate
 
 router = APIRouter(
     prefix="/patrimonios",
     tags=["patrimonios"],
 )
 
+# Caché de picker/listado/detalle por usuario (JSON ya serializado).
+# Se invalida en cualquier escritura sobre Patrimonio de este router, pero
+# TTL corto (como el listado de inversiones): con la caché en memoria la
+# invalidación solo llega al worker que escribe, y la sincronización de BD
+# (db_router) copia patrimonio/patrimonio_compra sin pasar por aquí.
+_CACHE_TTL = 30
+_PICKER_ADAPTER = TypeAdapter(List[PatrimonioPickerOut])
+_LIST_ADAPTER = TypeAdapter(List[PatrimonioSchema])
+_LIST_COMPRA_ADAPTER = TypeAdapter(List[PatrimonioConCompraSchema])
+_DETAIL_ADAPTER = TypeAdapter(PatrimonioSchema)
+
+
+# Opciones para toda carga ORM de este router. Con DB_RAISELOAD (dev/tests)
+# cualquier relación no cargada explícitamente lanza error en vez de hacer
+# un lazy load por fila. Los listados son selects de columnas y no aplican.
+_LOAD_OPTS = (raiseload("*"),) if settings.DB_RAISELOAD else ()
+
+# ¿Tiene el modelo la columna 'disponible'? Se resuelve una vez al importar.
+_HAS_DISPONIBLE = "disponible" in models.Patrimonio.__table__.c
+
+
+def _cache_ns(user_id: int) -> str:
+    return f"pat:{user_id}"
+
+
+def _json(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
 # ---------- Helpers de texto/dirección ----------
 
 
@@ -70,6 +105,11 @@ def _componer_direccion_completa(
 
     Solo añade las partes que no son None, separadas por comas.
     """
+    # Caso habitual (todas las partes informadas): una sola f-string,
+    # sin lista intermedia ni join.
+    if calle and numero and escalera and piso and puerta and localidad:
+        return f"{calle}, Nº {numero}, ESC {escalera}, PISO {piso}, PUERTA {puerta}, {localidad}"
+
     parts: list[str] = []
     if calle:
         parts.append(str(calle))
@@ -113,19 +153,33 @@ def _generar_referencia(
     return base.upper()
 
 
-def _coerce_row(r: models.Patrimonio) -> dict:
+# Columnas que necesita _coerce_row: los listados las proyectan con un
+# select() explícito en vez de hidratar objetos Patrimonio completos.
+_PATRIMONIO_COLS = tuple(
+    c for c in models.Patrimonio.__table__.c if c.key != "user_id"
+)
+
+
+def _coerce_row(r) -> dict:
     """
-    Convierte un objeto Patrimonio de SQLAlchemy en un dict
-    compatible con PatrimonioSchema.
+    Convierte un Patrimonio (objeto ORM o Row de _PATRIMONIO_COLS) en un
+    dict compatible con PatrimonioSchema.
 
     - tipo_inmueble: se normaliza a str.
     - fecha_adquisicion: se serializa como ISO (YYYY-MM-DD) si existe.
     - disponible: se lee solo si existe la columna.
+
+    Se llama una vez por fila en los listados: acceso directo a las
+    columnas mapeadas (getattr solo donde la columna puede no existir).
     """
-    ti = getattr(r, "tipo_inmueble", None)
-    tipo_inm = str(getattr(ti, "value", ti)) if ti is not None else "VIVIENDA"
-    fa = getattr(r, "fecha_adquisicion", None)
-    fa_iso = fa.isoformat()[:10] if fa else None
+    ti = r.tipo_inmueble
+    if ti is None:
+        tipo_inm = "VIVIENDA"
+    elif isinstance(ti, models.TipoInmueble):
+        tipo_inm = ti.value
+    else:
+        tipo_inm = str(ti)
+    fa = r.fecha_adquisicion
 
     return {
         "id": r.id,
@@ -138,19 +192,53 @@ def _coerce_row(r: models.Patrimonio) -> dict:
         "referencia": r.referencia or None,
         "direccion_completa": r.direccion_completa or None,
         "tipo_inmueble": tipo_inm,
-        "fecha_adquisicion": fa_iso,
-        "activo": bool(getattr(r, "activo", True)),
-        "disponible": getattr(r, "disponible", None),
-        "superficie_m2": getattr(r, "superficie_m2", None),
-        "superficie_construida": getattr(r, "superficie_construida", None),
-        "participacion_pct": getattr(r, "participacion_pct", None),
-        "habitaciones": getattr(r, "habitaciones", None),
-        "banos": getattr(r, "banos", None),
-        "garaje": bool(getattr(r, "garaje", False)),
-        "trastero": bool(getattr(r, "trastero", False)),
+        "fecha_adquisicion": fa.isoformat()[:10] if fa else None,
+        "activo": bool(r.activo),
+        "disponible": r.disponible if _HAS_DISPONIBLE else None,
+        "superficie_m2": r.superficie_m2,
+        "superficie_construida": r.superficie_construida,
+        "participacion_pct": r.participacion_pct,
+        "habitaciones": r.habitaciones,
+        "banos": r.banos,
+        "garaje": bool(r.garaje),
+        "trastero": bool(r.trastero),
     }
 
 
+def _patch_patrimonio(
+    db: Session,
+    patrimonio_id: str,
+    user_id: int,
+    **values,
+) -> dict:
+    """
+    Actualiza columnas sueltas de un patrimonio del usuario con un único
+    UPDATE ... RETURNING (sin SELECT previo ni refresh) y hace commit.
+
+    - 404 si no existe o no pertenece al usuario.
+    - Devuelve el dict de _coerce_row con los valores ya actualizados.
+    """
+    stmt = (
+        update(models.Patrimonio)
+        .where(
+            models.Patrimonio.id == patrimonio_id,
+            models.Patrimonio.user_id == user_id,
+        )
+        .values(**values)
+        .returning(*_PATRIMONIO_COLS)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patrimonio no encontrado",
+        )
+    db.commit()
+    invalidate(_cache_ns(user_id))
+    return _coerce_row(row)
+
+
 # ---------- Cálculos adquisición (COMPRA) ----------
 
 
@@ -179,6 +267,50 @@ def _compute_financials(payload: PatrimonioCompraIn) -> Tuple[Optional[float], O
     return imp_eur, total
 
 
+def _compra_out(row: models.PatrimonioCompra) -> PatrimonioCompraOut:
+    """
+    Construye PatrimonioCompraOut a partir de la fila de compra ya cargada
+    (lo usan el GET y los upserts, sin volver a consultar).
+    """
+    return PatrimonioCompraOut(
+        patrimonio_id=row.patrimonio_id,
+        valor_compra=row.valor_compra,
+        valor_referencia=getattr(row, "valor_referencia", None),
+        impuestos_pct=getattr(row, "impuestos_pct", None),
+        impuestos_eur=getattr(row, "impuestos_eur", None),
+        notaria=getattr(row, "notaria", None),
+        agencia=getattr(row, "agencia", None),
+        reforma_adecuamiento=getattr(row, "reforma_adecuamiento", None),
+        total_inversion=getattr(row, "total_inversion", None),
+
+        valor_mercado=getattr(row, "valor_mercado", None),
+        valor_mercado_fecha=getattr(row, "valor_mercado_fecha", None),
+
+        notas=getattr(row, "notas", None),
+        created_at=getattr(row, "created_at", None),
+        updated_at=getattr(row, "updated_at", None),
+        activo=getattr(row, "activo", None) if hasattr(row, "activo") else None,
+    )
+
+
+def _adjuntar_compras(db: Session, items: List[dict]) -> None:
+    """
+    Añade a cada dict de _coerce_row la clave "compra" (PatrimonioCompraOut
+    o None) con una sola query IN para todo el listado, en vez de un
+    GET /{id}/compra por patrimonio desde el cliente.
+    """
+    compras = {}
+    if items:
+        stmt = (
+            select(models.PatrimonioCompra)
+            .options(*_LOAD_OPTS)
+            .where(models.PatrimonioCompra.patrimonio_id.in_([it["id"] for it in items]))
+        )
+        compras = {c.patrimonio_id: _compra_out(c) for c in db.execute(stmt).scalars()}
+    for it in items:
+        it["compra"] = compras.get(it["id"])
+
+
 # ----------- Rutas -----------
 
 
@@ -200,33 +332,39 @@ def picker_patrimonios(
     - referencia (o id si no hay)
     - direccion_completa
     """
-    q = (
-        db.query(models.Patrimonio)
-        .filter(
-            models.Patrimonio.user_id == current_user.id,
-            models.Patrimonio.activo == activos,
+    key = cache_key(_cache_ns(current_user.id), "picker", int(activos))
+    body = cache_get(key)
+    if body is not None:
+        return _json(body)
+
+    pat = models.Patrimonio
+    stmt = (
+        select(pat.id, pat.referencia, pat.direccion_completa)
+        .where(
+            pat.user_id == current_user.id,
+            pat.activo == activos,
         )
-        .order_by(models.Patrimonio.referencia.asc())
+        .order_by(pat.referencia.asc())
     )
-    rows = q.all()
-    out: List[PatrimonioPickerOut] = []
-    for r in rows:
-        out.append(
-            PatrimonioPickerOut.model_validate(
-                {
-                    "id": r.id,
-                    "referencia": r.referencia or r.id,
-                    "direccion_completa": r.direccion_completa or "",
-                }
-            )
+    # Solo 3 columnas y sin ORM: los valores ya tienen el tipo del schema
+    out = [
+        PatrimonioPickerOut.model_construct(
+            id=pid,
+            referencia=referencia or pid,
+            direccion_completa=direccion or "",
         )
-    return out
+        for pid, referencia, direccion in db.execute(stmt)
+    ]
+    body = _PICKER_ADAPTER.dump_json(out)
+    cache_set(key, body, ttl=_CACHE_TTL)
+    return _json(body)
 
 
 # 2) Listado
 @router.get(
     "",
-    response_model=List[PatrimonioSchema],
+    # Con expand=compra las filas son PatrimonioConCompraSchema
+    response_model=List[Union[PatrimonioConCompraSchema, PatrimonioSchema]],
     summary="Listar patrimonios",
 )
 def listar_patrimonios(
@@ -243,6 +381,10 @@ def listar_patrimonios(
         pattern="^(asc|desc)$",
         description="asc|desc por fecha_adquisicion.",
     ),
+    expand: Optional[List[str]] = Query(
+        None,
+        description="Bloques relacionados a incluir en cada fila: 'compra'.",
+    ),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_user),
 ):
@@ -252,14 +394,24 @@ def listar_patrimonios(
     - activos: True/False (si es None, no filtra).
     - disponibles: True/False (solo si existe la columna).
     - ordenar: 'asc' o 'desc' por fecha_adquisicion y referencia.
+    - expand=compra: cada fila incluye su bloque 'compra' (o null), cargado
+      con una única query adicional (PatrimonioConCompraSchema).
     """
-    q = db.query(models.Patrimonio).filter(
+    con_compra = bool(expand) and "compra" in expand
+    key = cache_key(
+        _cache_ns(current_user.id), "list", activos, disponibles, ordenar, int(con_compra)
+    )
+    body = cache_get(key)
+    if body is not None:
+        return _json(body)
+
+    q = select(*_PATRIMONIO_COLS).where(
         models.Patrimonio.user_id == current_user.id
     )
     if activos is not None:
-        q = q.filter(models.Patrimonio.activo == activos)
-    if hasattr(models.Patrimonio, "disponible") and (disponibles is not None):
-        q = q.filter(models.Patrimonio.disponible == disponibles)
+        q = q.where(models.Patrimonio.activo == activos)
+    if _HAS_DISPONIBLE and (disponibles is not None):
+        q = q.where(models.Patrimonio.disponible == disponibles)
 
     # Orden por fecha (nulls last) y referencia
     if ordenar == "asc":
@@ -273,8 +425,15 @@ def listar_patrimonios(
             models.Patrimonio.referencia.asc(),
         )
 
-    res = q.all()
-    return [_coerce_row(r) for r in res]
+    rows = [_coerce_row(r) for r in db.execute(q)]
+    if con_compra:
+        _adjuntar_compras(db, rows)
+        adapter = _LIST_COMPRA_ADAPTER
+    else:
+        adapter = _LIST_ADAPTER
+    body = adapter.dump_json(adapter.validate_python(rows))
+    cache_set(key, body, ttl=_CACHE_TTL)
+    return _json(body)
 
 
 # 3) Detalle
@@ -293,13 +452,20 @@ def get_patrimonio(
 
     - 404 si no existe o no pertenece al usuario.
     """
-    row = db.get(models.Patrimonio, patrimonio_id)
+    key = cache_key(_cache_ns(current_user.id), "get", patrimonio_id)
+    body = cache_get(key)
+    if body is not None:
+        return _json(body)
+
+    row = db.get(models.Patrimonio, patrimonio_id, options=_LOAD_OPTS)
     if not row or row.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patrimonio no encontrado",
         )
-    return _coerce_row(row)
+    body = _DETAIL_ADAPTER.dump_json(_DETAIL_ADAPTER.validate_python(_coerce_row(row)))
+    cache_set(key, body, ttl=_CACHE_TTL)
+    return _json(body)
 
 
 # 4) Crear
@@ -362,7 +528,7 @@ def crear_patrimonio(
         # disponible: solo si existe en el modelo/BD
         **(
             {"disponible": bool(getattr(payload, "disponible", True))}
-            if hasattr(models.Patrimonio, "disponible")
+            if _HAS_DISPONIBLE
             else {}
         ),
         superficie_m2=getattr(payload, "superficie_m2", None),
@@ -375,6 +541,7 @@ def crear_patrimonio(
     )
     db.add(row)
     db.commit()
+    invalidate(_cache_ns(current_user.id))
     db.refresh(row)
     return _coerce_row(row)
 
@@ -398,7 +565,7 @@ def actualizar_patrimonio(
     - Convierte campos de texto relevantes a MAYÚSCULAS sin tildes.
     - Recompone direccion_completa con los datos actualizados.
     """
-    row = db.get(models.Patrimonio, patrimonio_id)
+    row = db.get(models.Patrimonio, patrimonio_id, options=_LOAD_OPTS)
     if not row or row.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -442,7 +609,7 @@ def actualizar_patrimonio(
 
     # disponible si existe en el modelo
     if (
-        hasattr(models.Patrimonio, "disponible")
+        _HAS_DISPONIBLE
         and hasattr(payload, "disponible")
         and (payload.disponible is not None)
     ):
@@ -453,6 +620,7 @@ def actualizar_patrimonio(
     )
 
     db.commit()
+    invalidate(_cache_ns(current_user.id))
     db.refresh(row)
     return _coerce_row(row)
 
@@ -473,16 +641,7 @@ def activar_patrimonio(
 
     - 404 si no existe o no pertenece al usuario.
     """
-    row = db.get(models.Patrimonio, patrimonio_id)
-    if not row or row.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patrimonio no encontrado",
-        )
-    row.activo = True
-    db.commit()
-    db.refresh(row)
-    return _coerce_row(row)
+    return _patch_patrimonio(db, patrimonio_id, current_user.id, activo=True)
 
 
 @router.patch(
@@ -500,16 +659,7 @@ def inactivar_patrimonio(
 
     - 404 si no existe o no pertenece al usuario.
     """
-    row = db.get(models.Patrimonio, patrimonio_id)
-    if not row or row.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patrimonio no encontrado",
-        )
-    row.activo = False
-    db.commit()
-    db.refresh(row)
-    return _coerce_row(row)
+    return _patch_patrimonio(db, patrimonio_id, current_user.id, activo=False)
 
 
 # 7) Disponible / No disponible
@@ -527,24 +677,15 @@ def set_disponible_flag(
     """
     Marca un patrimonio como disponible o no, usando un flag booleano.
 
-    - 404 si no existe o no pertenece al usuario.
     - 400 si la columna 'disponible' no existe en el modelo/BD.
+    - 404 si no existe o no pertenece al usuario.
     """
-    row = db.get(models.Patrimonio, patrimonio_id)
-    if not row or row.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Patrimonio no encontrado",
-        )
-    if not hasattr(row, "disponible"):
+    if not _HAS_DISPONIBLE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La columna 'disponible' no existe en Patrimonio.",
         )
-    row.disponible = bool(flag)
-    db.commit()
-    db.refresh(row)
-    return _coerce_row(row)
+    return _patch_patrimonio(db, patrimonio_id, current_user.id, disponible=bool(flag))
 
 
 @router.patch(
@@ -596,37 +737,18 @@ def get_compra(
     - 404 si el patrimonio no existe o no pertenece al usuario.
     - Si no existe registro de compra → None.
     """
-    patr = db.get(models.Patrimonio, patrimonio_id)
+    patr = db.get(models.Patrimonio, patrimonio_id, options=_LOAD_OPTS)
     if not patr or patr.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patrimonio no encontrado",
         )
 
-    row = db.get(models.PatrimonioCompra, patrimonio_id)
+    row = db.get(models.PatrimonioCompra, patrimonio_id, options=_LOAD_OPTS)
     if not row:
         return None
 
-    return PatrimonioCompraOut(
-        patrimonio_id=patrimonio_id,
-        valor_compra=row.valor_compra,
-        valor_referencia=getattr(row, "valor_referencia", None),
-        impuestos_pct=getattr(row, "impuestos_pct", None),
-        impuestos_eur=getattr(row, "impuestos_eur", None),
-        notaria=getattr(row, "notaria", None),
-        agencia=getattr(row, "agencia", None),
-        reforma_adecuamiento=getattr(row, "reforma_adecuamiento", None),
-        total_inversion=getattr(row, "total_inversion", None),
-
-        # ✅ AÑADIR ESTO
-        valor_mercado=getattr(row, "valor_mercado", None),
-        valor_mercado_fecha=getattr(row, "valor_mercado_fecha", None),
-
-        notas=getattr(row, "notas", None),
-        created_at=getattr(row, "created_at", None),
-        updated_at=getattr(row, "updated_at", None),
-        activo=getattr(row, "activo", None) if hasattr(row, "activo") else None,
-    )
+    return _compra_out(row)
 
 
 @router.post(
@@ -647,14 +769,14 @@ def crear_o_actualizar_compra(
     - Calcula impuestos_eur y total_inversion con _compute_financials.
     - notas se deja en el formato que venga (NO se fuerza a mayúsculas).
     """
-    patr = db.get(models.Patrimonio, patrimonio_id)
+    patr = db.get(models.Patrimonio, patrimonio_id, options=_LOAD_OPTS)
     if not patr or patr.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patrimonio no encontrado",
         )
 
-    row = db.get(models.PatrimonioCompra, patrimonio_id)  # PK = patrimonio_id
+    row = db.get(models.PatrimonioCompra, patrimonio_id, options=_LOAD_OPTS)  # PK = patrimonio_id
     imp_eur, total = _compute_financials(payload)
 
     if row is None:
@@ -683,8 +805,11 @@ def crear_o_actualizar_compra(
         row.notas = payload.notas
 
     db.commit()
+    # El listado con expand=compra incluye este bloque
+    invalidate(_cache_ns(current_user.id))
+    # refresh para los valores de servidor (created_at/updated_at/valor_mercado_fecha)
     db.refresh(row)
-    return get_compra(patrimonio_id, db, current_user)
+    return _compra_out(row)
 
 
 @router.put(
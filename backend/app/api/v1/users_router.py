@@ -23,6 +23,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 
+from backend.app.api.v1.auth_router import forget_user
 from backend.app.db.session import get_db
 from backend.app.db import models
 from backend.app.schemas.users import UserCreate, UserUpdate, UserRead
@@ -186,6 +187,7 @@ def update_user(
         row.role = _normalize_role(payload.role)
 
     db.commit()
+    forget_user(user_id)
     db.refresh(row)
     return row
 
@@ -205,4 +207,5 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 
     db.delete(row)
     db.commit()
+    forget_user(user_id)
     return None
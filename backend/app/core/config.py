@@ -118,6 +118,18 @@ class Settings(BaseSettings):
     FORCE_DB: str = ""           # "", "neon" o "supabase"
     DB_USE_NULLPOOL: bool = False
 
+    # Pool de conexiones (QueuePool; se ignora con NullPool).
+    # Ojo: el total real es (DB_POOL_SIZE + DB_MAX_OVERFLOW) * nº de workers
+    # de uvicorn, y debe quedar por debajo del max_connections del servidor.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+
+    # Solo desarrollo/tests: raiseload("*") en las cargas ORM de los routers
+    # que lo soportan, para que un lazy load (N+1) falle en vez de colarse.
+    DB_RAISELOAD: bool = False
+
     # Fuente principal de BD
     DATABASE_URL: Optional[str] = None
 
@@ -125,6 +137,11 @@ class Settings(BaseSettings):
     DB_URL_NEON: Optional[str] = None
     DB_URL_SUPABASE: Optional[str] = None
 
+    # ---- Caché de respuestas (ver backend/app/utils/cache.py)
+    # Si REDIS_URL está vacía se usa una caché en memoria por proceso.
+    REDIS_URL: str = ""
+    CACHE_PREFIX: str = "gapp"
+
     # ---- Admin / features
     ADMIN_EMAILS: str = ""
     ENABLE_DEBUG_ENDPOINTS: bool = False
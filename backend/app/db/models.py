@@ -25,6 +25,7 @@ from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from sqlalchemy.dialects.postgresql import ENUM as PGEnum
 from uuid import uuid4
+import secrets
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 
 # =============================================
@@ -372,6 +373,14 @@ class MovimientoCuenta(Base):
     saldo_destino_antes = Column(Numeric(12, 2), nullable=True)
     saldo_destino_despues = Column(Numeric(12, 2), nullable=True)
 
+    __table_args__ = (
+        # Listado: WHERE user_id = ? ORDER BY fecha DESC, id DESC LIMIT n
+        Index("ix_mov_user_fecha_id", user_id, fecha.desc(), id.desc()),
+        # Filtro por cuenta (origen OR destino) y comprobación de las FKs
+        Index("ix_mov_cuenta_origen", "cuenta_origen_id"),
+        Index("ix_mov_cuenta_destino", "cuenta_destino_id"),
+    )
+
     # Relaciones
     cuenta_origen = relationship(
         "CuentaBancaria",
@@ -387,7 +396,16 @@ class MovimientoCuenta(Base):
 
 class Ingreso(Base):
     __tablename__ = "ingresos"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Resumen mensual: agregados por usuario/mes cubiertos por el índice
+        sa.Index(
+            "ix_ingreso_user_fecha",
+            "user_id",
+            "ultimo_ingreso_on",
+            postgresql_include=["importe", "activo", "kpi", "cobrado", "periodicidad"],
+        ),
+        {"extend_existing": True},
+    )
 
     id                     = Column(String, primary_key=True, index=True)
     rango_cobro            = Column(String, nullable=True)   # (pendiente migrar a Date si procede)
@@ -423,7 +441,16 @@ class Ingreso(Base):
 
 class Gasto(Base):
     __tablename__ = "gastos"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Resumen mensual: agregados por usuario/mes cubiertos por el índice
+        sa.Index(
+            "ix_gasto_user_pago",
+            "user_id",
+            "ultimo_pago_on",
+            postgresql_include=["importe_cuota", "segmento_id", "periodicidad", "pagado", "activo", "kpi"],
+        ),
+        {"extend_existing": True},
+    )
 
     id                     = Column(String, primary_key=True, index=True)
     fecha                  = Column(Date, index=True)
@@ -495,13 +522,22 @@ class Gasto(Base):
 
 class GastoCotidiano(Base):
     __tablename__ = "gastos_cotidianos"
-    __table_args__ = {
-        "extend_existing": True,
-        "schema": "public",
-        # Nota: se eliminan CHECKS restrictivos previos. Validación por API:
-        # - sólo tipos cuyo segmento sea COTIDIANOS
-        # - reglas de evento/observaciones si aplican
-    }
+    __table_args__ = (
+        # Resumen mensual: cotidianos pagados por usuario/mes
+        sa.Index(
+            "ix_gasto_cot_user_fecha",
+            "user_id",
+            "fecha",
+            postgresql_include=["importe", "pagado"],
+        ),
+        {
+            "extend_existing": True,
+            "schema": "public",
+            # Nota: se eliminan CHECKS restrictivos previos. Validación por API:
+            # - sólo tipos cuyo segmento sea COTIDIANOS
+            # - reglas de evento/observaciones si aplican
+        },
+    )
 
     id           = Column(String, primary_key=True, index=True)
     fecha        = Column(Date, index=True)
@@ -606,6 +642,8 @@ class CierreMensual(Base):
         sa.UniqueConstraint("anio", "mes", name="uq_cierre_anio_mes"),
         sa.CheckConstraint("mes BETWEEN 1 AND 12", name="ck_cierre_mes_1_12"),
         sa.CheckConstraint("criterio IN ('CAJA')", name="ck_cierre_criterio"),
+        # Ventanas por periodo del resumen mensual: (user_id, anio, mes)
+        sa.Index("ix_cierre_user_yearmonth", "user_id", "anio", "mes"),
         {"extend_existing": True},
     )
 
@@ -859,13 +897,12 @@ class PrestamoCuota(Base):
 # =============================================
 
 def gen_inversion_id() -> str:
-    # INV- + UUID corto
-    return "INV-" + uuid4().hex[:10].upper()
+    # INV- + 10 hex (40 bits aleatorios, sin generar un UUID completo)
+    return "INV-" + secrets.token_hex(5).upper()
 
 
 class Inversion(Base):
     __tablename__ = "inversion"
-    __table_args__ = {"extend_existing": True}
 
     id = Column(String, primary_key=True, index=True, default=gen_inversion_id)
 
@@ -937,6 +974,13 @@ class Inversion(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Listado: WHERE user_id = ? ORDER BY fecha_creacion DESC, nombre ASC
+        Index("ix_inversion_user_fecha_nombre", user_id, fecha_creacion.desc(), nombre),
+        Index("ix_inversion_user_estado", "user_id", "estado"),
+        {"extend_existing": True},
+    )
+
 
 class InversionMetrica(Base):
     __tablename__ = "inversion_metrica"
@@ -9,6 +9,7 @@ Puntos clave:
   - options: search_path
   - connect_timeout, sslmode
 - NullPool opcional: recomendado cuando pasas por pooler (p.ej. Supabase pooler/PgBouncer)
+- Si no, QueuePool dimensionado desde settings (DB_POOL_*)
 """
 
 from __future__ import annotations
@@ -68,8 +69,18 @@ engine_kwargs = dict(
 )
 
 # 3) Pooling: NullPool cuando procede
-if _should_use_nullpool(DATABASE_URL):
+USE_NULLPOOL = _should_use_nullpool(DATABASE_URL)
+if USE_NULLPOOL:
     engine_kwargs["poolclass"] = NullPool
+else:
+    # pool_recycle: descarta conexiones antes de que el servidor/proxy las
+    # cierre por inactividad (pool_pre_ping cubre el resto).
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
 
@@ -97,12 +108,16 @@ def get_db():
     """
     Dependencia FastAPI:
     - abre sesión
-    - fuerza search_path a public
+    - fuerza search_path a public (sólo detrás de pooler, ver abajo)
     - cierra sesión al finalizar
     """
     db = SessionLocal()
     try:
-        db.execute(text("SET search_path TO public;"))
+        # Con conexión directa, connect_args["options"] ya fija search_path al
+        # conectar: repetir el SET en cada petición es un round trip de más.
+        # Los poolers pueden ignorar "options", así que ahí se mantiene.
+        if USE_NULLPOOL:
+            db.execute(text("SET search_path TO public;"))
         yield db
     finally:
         db.close()
@@ -112,7 +112,7 @@ class MonthlySummaryResponse(BaseModel):
     """
     anio: int = Field(..., description="Año del periodo resumido.")
     mes: int = Field(..., description="Mes del periodo resumido (1-12).")
-    mes_label: str = Field(..., description="Etiqueta amigable del mes, p.ej. 'DICIEMBRE 2025'.")
+    mes_label: str = Field(..., description="Etiqueta amigable del mes, p.ej. 'Diciembre 2025'.")
 
     general: MonthlyGeneralKpi
     detalle_ingresos: MonthlyIngresosDetalle
@@ -4,7 +4,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MovimientoCuentaBase(BaseModel):
@@ -18,7 +18,10 @@ class MovimientoCuentaBase(BaseModel):
 
 class MovimientoCuentaCreate(MovimientoCuentaBase):
     # user_id lo sacamos del token, no del front
-    pass
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
+    # En el alta el importe es obligatorio, > 0 y con 2 decimales como mucho (422 si no)
+    importe: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
 
 
 class MovimientoCuentaRead(MovimientoCuentaBase):
@@ -64,7 +67,9 @@ class AjusteLiquidezPayload(BaseModel):
     Payload específico para el endpoint de ajuste de liquidez:
     POST /api/v1/movimientos-cuenta/ajuste-liquidez
     """
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
     fecha: date
     cuenta_id: str
-    nuevo_saldo: Decimal
+    nuevo_saldo: Decimal = Field(..., ge=0, max_digits=12, decimal_places=2)
     comentarios: Optional[str] = None
\ No newline at end of file
@@ -7,6 +7,7 @@ Incluye:
 - PatrimonioCreate / PatrimonioUpdate / PatrimonioSchema
 - PatrimonioPickerOut (para selects)
 - PatrimonioCompraIn / PatrimonioCompraOut (bloque de compra)
+- PatrimonioConCompraSchema (listado con expand=compra)
 
 Reglas generales:
 - La lógica del router se encargará de:
@@ -184,3 +185,12 @@ class PatrimonioCompraOut(PatrimonioCompraIn):
     activo: Optional[bool] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PatrimonioConCompraSchema(PatrimonioSchema):
+    """
+    Patrimonio con su bloque de compra embebido (GET /patrimonios?expand=compra).
+
+    - compra: None si el patrimonio no tiene datos de compra.
+    """
+    compra: Optional[PatrimonioCompraOut] = None
@@ -0,0 +1,199 @@
+# backend/app/utils/cache.py
+
+"""
+Caché de respuestas (bytes JSON) compartida por los routers.
+
+Backend:
+- Redis, si REDIS_URL está configurada y el paquete `redis` está instalado.
+- Si no, una caché en memoria del proceso (TTL + tamaño máximo). Sirve para
+  desarrollo o un único worker; con varios workers cada uno tiene la suya.
+
+Uso típico en un router:
+
+    key = cache_key(f"inv:{user_id}", estado, tipo_gasto_id)
+    hit = cache_get(key)
+    if hit is not None:
+        return Response(content=hit, media_type="application/json")
+    ...
+    cache_set(key, body, ttl=30)
+
+Invalidación:
+- Las claves incluyen la "versión" de su namespace (p.ej. "inv:<user_id>").
+- invalidate(namespace) incrementa esa versión: todas las claves anteriores
+  quedan huérfanas y caducan solas por TTL (sin SCAN/DEL en Redis).
+
+IMPORTANTE:
+- El namespace debe incluir SIEMPRE el user_id para no mezclar datos
+  entre usuarios.
+- Cualquier fallo de Redis se trata como "miss": la caché nunca debe
+  romper un endpoint.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis  # type: ignore
+except Exception:
+    redis = None  # fallback: caché en memoria
+
+
+# ============================================================
+# Backend en memoria (fallback)
+# ============================================================
+
+class MemoryCache:
+    """
+    Caché LRU con TTL, thread-safe (los endpoints sync corren en threadpool).
+
+    Guarda objetos Python tal cual: también se usa directamente para cachés
+    que sólo tienen sentido dentro del proceso (p.ej. la de autenticación).
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._versions: dict = {}
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    # Versiones de namespace: aparte de los datos para que el LRU nunca las
+    # expulse (volver a una versión antigua serviría entradas obsoletas).
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def incr(self, key: str) -> None:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+
+_memory = MemoryCache()
+_redis_client = None
+
+if redis is not None and settings.REDIS_URL:
+    try:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25,
+        )
+    except Exception as e:
+        logger.warning("Redis no disponible, usando caché en memoria: %s", e)
+        _redis_client = None
+
+
+# ============================================================
+# API pública
+# ============================================================
+
+def is_shared() -> bool:
+    """
+    True si la caché es compartida entre workers (Redis). Con la caché en
+    memoria, invalidate() solo llega al worker que hizo la escritura: los
+    TTL largos solo son seguros con Redis.
+    """
+    return _redis_client is not None
+
+
+def _version_key(namespace: str) -> str:
+    return f"{settings.CACHE_PREFIX}:ver:{namespace}"
+
+
+def _namespace_version(namespace: str) -> Optional[int]:
+    """
+    Versión actual del namespace, o None si no se ha podido leer (Redis
+    caído). No vale suponer 0: una clave v0 escrita antes de cualquier
+    invalidate() volvería a servirse en cuanto Redis se recupere.
+    """
+    if _redis_client is not None:
+        try:
+            v = _redis_client.get(_version_key(namespace))
+            return int(v) if v is not None else 0
+        except Exception:
+            return None
+    return _memory.version(_version_key(namespace))
+
+
+def cache_key(namespace: str, *parts: Any) -> Optional[str]:
+    """
+    Construye una clave: <prefix>:<namespace>:v<version>:<part1>:<part2>...
+
+    Devuelve None si no se conoce la versión del namespace: cache_get/cache_set
+    tratan esa clave como "sin caché" (miss y no se guarda nada).
+    """
+    version = _namespace_version(namespace)
+    if version is None:
+        return None
+    tail = ":".join("" if p is None else str(p) for p in parts)
+    return f"{settings.CACHE_PREFIX}:{namespace}:v{version}:{tail}"
+
+
+def cache_get(key: Optional[str]) -> Optional[bytes]:
+    """
+    Devuelve el valor cacheado o None (miss, caducado, Redis caído o key None).
+    """
+    if key is None:
+        return None
+    if _redis_client is not None:
+        try:
+            return _redis_client.get(key)
+        except Exception:
+            return None
+    return _memory.get(key)
+
+
+def cache_set(key: Optional[str], value: bytes, ttl: int) -> None:
+    """
+    Guarda `value` durante `ttl` segundos. Errores de Redis se ignoran; con
+    key None (versión desconocida) no se guarda nada.
+    """
+    if key is None:
+        return
+    if _redis_client is not None:
+        try:
+            _redis_client.set(key, value, ex=ttl)
+        except Exception:
+            pass
+        return
+    _memory.set(key, value, ttl)
+
+
+def invalidate(namespace: str) -> None:
+    """
+    Invalida todas las claves del namespace (incrementa su versión).
+    """
+    if _redis_client is not None:
+        try:
+            _redis_client.incr(_version_key(namespace))
+        except Exception:
+            pass
+        return
+    _memory.incr(_version_key(namespace))
@@ -10,6 +10,7 @@ Por ahora:
 
 from __future__ import annotations
 import unicodedata
+from functools import lru_cache
 from typing import Optional  # si no estaba ya
 
 
@@ -33,10 +34,15 @@ def normalize_upper(value: Optional[str]) -> Optional[str]:
     s = value.strip().upper()
     return s or None
 
+@lru_cache(maxsize=4096)
 def normalize_upper_ascii(value: Optional[str]) -> Optional[str]:
     """
     Igual que normalize_upper, pero además elimina tildes/acentos.
 
+    Cacheada: los valores (nombres, calles, localidades...) se repiten mucho
+    entre peticiones y la normalización unicode es lo caro. El resultado
+    es un str inmutable, así que compartirlo es seguro.
+
     - None -> None
     - Convierte a str
     - Normaliza en NFD y elimina caracteres de tipo 'Mn' (marcas de acento)
@@ -0,0 +1,87 @@
+# backend/tests/test_cache.py
+
+import time
+
+from backend.app.utils import cache
+from backend.app.utils.cache import MemoryCache, cache_get, cache_key, cache_set, invalidate
+
+
+def test_memory_cache_ttl_and_lru():
+    c = MemoryCache(maxsize=2)
+    c.set("a", 1, ttl=60)
+    c.set("b", 2, ttl=60)
+    assert c.get("a") == 1  # "a" pasa a ser la más reciente
+    c.set("c", 3, ttl=60)   # expulsa "b" (la menos usada)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+
+    c.set("x", 1, ttl=0)
+    time.sleep(0.01)
+    assert c.get("x") is None
+
+
+def test_memory_cache_versions_survive_lru():
+    c = MemoryCache(maxsize=1)
+    c.incr("ver:ns")
+    c.set("k1", 1, ttl=60)
+    c.set("k2", 2, ttl=60)
+    assert c.version("ver:ns") == 1
+
+
+def test_invalidate_bumps_namespace_version():
+    assert not cache.is_shared()
+
+    ns = "test:1"
+    key = cache_key(ns, "a", None, 3)
+    cache_set(key, b"[1]", ttl=60)
+    assert cache_get(key) == b"[1]"
+
+    invalidate(ns)
+    new_key = cache_key(ns, "a", None, 3)
+    assert new_key != key
+    assert cache_get(new_key) is None
+
+    # Otros namespaces (p.ej. otro usuario) no se ven afectados
+    other = cache_key("test:2", "a")
+    cache_set(other, b"x", ttl=60)
+    invalidate(ns)
+    assert cache_get(cache_key("test:2", "a")) == b"x"
+
+
+class _RedisCaido:
+    """Redis falso: get() falla mientras `caido` sea True."""
+
+    def __init__(self):
+        self.caido = False
+        self.data = {}
+
+    def get(self, key):
+        if self.caido:
+            raise ConnectionError("redis caído")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+
+
+def test_version_ilegible_no_usa_cache(monkeypatch):
+    fake = _RedisCaido()
+    monkeypatch.setattr(cache, "_redis_client", fake)
+
+    ns = "test:redis"
+    cache_set(cache_key(ns, "a"), b"viejo", ttl=60)  # clave v0
+    invalidate(ns)                                   # ahora v1
+
+    # Redis falla al leer la versión: ni se lee ni se escribe nada
+    fake.caido = True
+    assert cache_key(ns, "a") is None
+    assert cache_get(None) is None
+    cache_set(None, b"durante-fallo", ttl=60)
+    assert b"durante-fallo" not in fake.data.values()
+
+    # Al recuperarse, se usa v1: el cuerpo v0 nunca vuelve a servirse
+    fake.caido = False
+    assert cache_get(cache_key(ns, "a")) is None
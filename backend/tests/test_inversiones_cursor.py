@@ -0,0 +1,21 @@
+# backend/tests/test_inversiones_cursor.py
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app.api.v1.inversiones_router import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    row = SimpleNamespace(fecha_creacion=date(2025, 3, 9), nombre="PISO ÁTICO, 3º", id="INV-1")
+    assert _decode_cursor(_encode_cursor(row)) == (date(2025, 3, 9), "PISO ÁTICO, 3º", "INV-1")
+
+
+@pytest.mark.parametrize("cursor", ["", "no-es-base64!", "WyJ4Il0="])
+def test_cursor_invalido_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
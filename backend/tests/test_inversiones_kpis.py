@@ -0,0 +1,56 @@
+# backend/tests/test_inversiones_kpis.py
+
+from decimal import Decimal
+
+import pytest
+
+from backend.app.api.v1.inversiones_router import _kpi_block, _kpi_values
+
+
+def test_kpis_basicos():
+    k = _kpi_block(100, 150, 24)
+    assert k.moic == 1.5
+    assert k.roi_pct == 50.0
+    assert k.irr_pct_aprox == 22.47
+    assert k.puede_calcular_moic and k.puede_calcular_roi and k.puede_calcular_irr
+
+
+def test_kpis_moic_alto_plazo_corto_no_rompe():
+    # 20 ** 12: antes provocaba InvalidOperation (500 en /kpis)
+    k = _kpi_block(100, 2000, 1)
+    assert k.moic == 20.0
+    assert k.roi_pct == 1900.0
+    assert k.puede_calcular_irr
+
+
+def test_kpis_valores_extremos_no_rompen():
+    # Máximos de Numeric(14, 2): MOIC ~1e14, sigue siendo calculable
+    out = _kpi_values(Decimal("0.01"), Decimal("999999999999.99"), 1)
+    assert out["puede_calcular_moic"] and out["puede_calcular_irr"]
+
+    # MOIC ** 12 desborda el float: IRR no calculable, sin excepción
+    out = _kpi_values(Decimal(1), Decimal("1e30"), 1)
+    assert out["puede_calcular_moic"]
+    assert "puede_calcular_irr" not in out
+
+
+def test_kpis_moic_negativo_sin_irr():
+    out = _kpi_values(Decimal(100), Decimal(-50), 12)
+    assert out["moic"] == -0.5
+    assert out["roi_pct"] == -150.0
+    assert "puede_calcular_irr" not in out
+
+
+@pytest.mark.parametrize(
+    "aporte,retorno,meses",
+    [(None, Decimal(10), 12), (Decimal(0), Decimal(10), 12), (Decimal(100), None, 12)],
+)
+def test_kpis_sin_datos(aporte, retorno, meses):
+    out = _kpi_values(aporte, retorno, meses)
+    assert "moic" not in out and "roi_pct" not in out
+
+
+def test_kpis_sin_plazo_sin_irr():
+    out = _kpi_values(Decimal(100), Decimal(200), 0)
+    assert out["moic"] == 2.0
+    assert "irr_pct_aprox" not in out
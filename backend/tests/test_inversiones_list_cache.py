@@ -0,0 +1,83 @@
+# backend/tests/test_inversiones_list_cache.py
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.app.api.v1 import inversiones_router as inv_router
+from backend.app.db import models
+from backend.app.utils.cache import invalidate
+
+USER_ID = 77
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(
+        engine,
+        tables=[models.TipoGasto.__table__, models.Proveedor.__table__, models.Inversion.__table__],
+    )
+    with Session(engine) as session:
+        session.add(models.TipoGasto(id="TG-INV", nombre="JV"))
+        for i, fecha in enumerate([date(2025, 3, 1), date(2025, 2, 1), date(2025, 1, 1)]):
+            session.add(models.Inversion(
+                id=f"INV-{i}", user_id=USER_ID, tipo_gasto_id="TG-INV",
+                nombre=f"INVERSION {i}", estado="ACTIVA", moneda="EUR", fecha_creacion=fecha,
+            ))
+        session.commit()
+        invalidate(inv_router._list_cache_ns(USER_ID))
+        yield session
+
+
+def _listar(db, **kw):
+    args = dict(estado=None, tipo_gasto_id=None, proveedor_id=None, dealer_id=None, limit=None, cursor=None)
+    args.update(kw)
+    r = inv_router.listar_inversiones(
+        response=Response(), db=db, current_user=SimpleNamespace(id=USER_ID), **args
+    )
+    if isinstance(r, Response):
+        return [x["id"] for x in json.loads(r.body)]
+    return [x.id for x in r]
+
+
+def test_listado_completo_cacheado(db):
+    assert _listar(db) == ["INV-0", "INV-1", "INV-2"]
+
+    # Sin invalidar, el listado se sirve de caché aunque cambie la BD
+    db.get(models.Inversion, "INV-2").nombre = "CAMBIADA"
+    db.add(models.Inversion(id="INV-X", user_id=USER_ID, tipo_gasto_id="TG-INV",
+                            nombre="NUEVA", estado="ACTIVA", moneda="EUR",
+                            fecha_creacion=date(2025, 4, 1)))
+    db.commit()
+    assert _listar(db) == ["INV-0", "INV-1", "INV-2"]
+
+    invalidate(inv_router._list_cache_ns(USER_ID))
+    assert _listar(db) == ["INV-X", "INV-0", "INV-1", "INV-2"]
+
+
+def test_cursor_sin_limit_no_comparte_cache(db):
+    cursor = inv_router._encode_cursor(db.get(models.Inversion, "INV-0"))
+
+    # Solo cursor: resto del listado (parcial)...
+    assert _listar(db, cursor=cursor) == ["INV-1", "INV-2"]
+    # ...que no debe quedarse como el listado completo
+    assert _listar(db) == ["INV-0", "INV-1", "INV-2"]
+    # y al revés: con el listado completo ya cacheado, el cursor sigue filtrando
+    assert _listar(db, cursor=cursor) == ["INV-1", "INV-2"]
+
+
+def test_paginacion_keyset(db):
+    response = Response()
+    args = dict(estado=None, tipo_gasto_id=None, proveedor_id=None, dealer_id=None, cursor=None)
+    rows = inv_router.listar_inversiones(
+        response=response, limit=2, db=db, current_user=SimpleNamespace(id=USER_ID), **args
+    )
+    assert [r.id for r in rows] == ["INV-0", "INV-1"]
+    nxt = response.headers["X-Next-Cursor"]
+    assert _listar(db, limit=2, cursor=nxt) == ["INV-2"]
@@ -0,0 +1,115 @@
+# backend/tests/test_monthly_summary_cache.py
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from backend.app.api.v1 import monthly_summary_router as msum
+from backend.app.db import models
+from backend.app.utils.cache import cache_get, cache_key, cache_set
+
+USER_ID = 41
+OTRO_USER_ID = 42
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://")
+    # Ingreso.cuenta es lazy="joined": la tabla de cuentas tiene que existir
+    models.Base.metadata.create_all(
+        engine, tables=[models.CuentaBancaria.__table__, models.Ingreso.__table__],
+    )
+    with Session(engine) as session:
+        yield session
+
+
+def _cachear(user_id: int) -> None:
+    cache_set(cache_key(msum._msum_cache_ns(user_id), 2025, 6, 1, 1), b"{}", ttl=60)
+
+
+def _cacheado(user_id: int) -> bool:
+    return cache_get(cache_key(msum._msum_cache_ns(user_id), 2025, 6, 1, 1)) is not None
+
+
+def _ingreso(id_: str, user_id: int = USER_ID) -> models.Ingreso:
+    return models.Ingreso(id=id_, user_id=user_id, periodicidad="MENSUAL", importe=100.0)
+
+
+def test_commit_orm_invalida_solo_al_usuario(db):
+    _cachear(USER_ID)
+    _cachear(OTRO_USER_ID)
+
+    db.add(_ingreso("INGRESO-AAAAA1"))
+    db.flush()
+    # Tras el flush pero antes del commit todavía no se invalida
+    assert _cacheado(USER_ID)
+
+    db.commit()
+    assert not _cacheado(USER_ID)
+    assert _cacheado(OTRO_USER_ID)
+
+
+def test_update_y_delete_orm_invalidan(db):
+    db.add(_ingreso("INGRESO-AAAAA2"))
+    db.commit()
+
+    _cachear(USER_ID)
+    db.get(models.Ingreso, "INGRESO-AAAAA2").importe = 250.0
+    db.commit()
+    assert not _cacheado(USER_ID)
+
+    _cachear(USER_ID)
+    db.delete(db.get(models.Ingreso, "INGRESO-AAAAA2"))
+    db.commit()
+    assert not _cacheado(USER_ID)
+
+
+def test_rollback_no_invalida(db):
+    _cachear(USER_ID)
+    db.add(_ingreso("INGRESO-AAAAA3"))
+    db.flush()
+    db.rollback()
+    assert _cacheado(USER_ID)
+
+    # Y lo apuntado antes del rollback no se arrastra al siguiente commit
+    db.commit()
+    assert _cacheado(USER_ID)
+
+
+def test_insert_core_requiere_invalidacion_explicita(db):
+    _cachear(USER_ID)
+    db.execute(insert(models.Ingreso).values(
+        id="INGRESO-AAAAA4", user_id=USER_ID, periodicidad="MENSUAL", importe=1.0,
+    ))
+    db.commit()
+    # Un INSERT de Core no pasa por el flush: los eventos no lo ven
+    assert _cacheado(USER_ID)
+
+    msum.invalidate_monthly_summary_cache(USER_ID)
+    assert not _cacheado(USER_ID)
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_etag_y_revalidacion_304():
+    body = b'{"total": 1}'
+    resp = msum._json_response(_request(), body)
+    assert resp.status_code == 200
+    assert resp.body == body
+    assert resp.headers["cache-control"] == "private, no-cache"
+    etag = resp.headers["etag"]
+
+    for valor in (etag, f"W/{etag}", f'"otro", {etag}', "*"):
+        resp = msum._json_response(_request(valor), body)
+        assert resp.status_code == 304
+        assert resp.body == b""
+        assert resp.headers["etag"] == etag
+
+    # Otro contenido, otro ETag: el cliente recibe el cuerpo nuevo
+    resp = msum._json_response(_request(etag), b'{"total": 2}')
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
@@ -0,0 +1,34 @@
+# backend/tests/test_movimiento_cuenta_schema.py
+
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app.schemas.movimiento_cuenta import AjusteLiquidezPayload, MovimientoCuentaCreate
+
+
+def _movimiento(importe: str) -> MovimientoCuentaCreate:
+    return MovimientoCuentaCreate(
+        fecha="2025-06-01", cuenta_origen_id="CTA-1", cuenta_destino_id="CTA-2", importe=importe,
+    )
+
+
+def _ajuste(nuevo_saldo: str) -> AjusteLiquidezPayload:
+    return AjusteLiquidezPayload(fecha="2025-06-01", cuenta_id="CTA-1", nuevo_saldo=nuevo_saldo)
+
+
+@pytest.mark.parametrize("construir", [_movimiento, _ajuste])
+def test_importes_limitados_a_numeric_12_2(construir):
+    # Máximo que cabe en Numeric(12,2)
+    assert construir("9999999999.99") is not None
+
+    for valor in ("10000000000", "10000000000.00", "1.234"):
+        with pytest.raises(ValidationError):
+            construir(valor)
+
+
+def test_importe_movimiento_positivo():
+    assert _movimiento("0.01").importe == Decimal("0.01")
+    with pytest.raises(ValidationError):
+        _movimiento("0")